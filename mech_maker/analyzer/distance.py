@@ -0,0 +1,100 @@
+"""Banded DTW and discrete Frechet distances between sampled curves, vectorized over diagonals and candidates"""
+
+from __future__ import annotations
+
+import numpy as np
+
+_METHODS = ('dtw', 'frechet')
+
+def _band_width(band: float | None, n: int, m: int) -> float:
+    """Band half width in samples for a fraction of the longer curve"""
+    if band is None or n < 2 or m < 2:
+        return np.inf
+    elif band < 0:
+        raise ValueError('band must be a non negative fraction, got ' + str(band))
+
+    # _warp measures the band along the columns, so it must span the columns the diagonal crosses per row
+    return max(1.0, np.ceil(band * max(n, m)), np.ceil((m - 1) / (n - 1)))
+
+def _warp(costs: np.ndarray, method: str, band: float) -> np.ndarray:
+    """Accumulated warping cost of each (B, N, M) cost matrix"""
+    batch, n, m = costs.shape
+    acc = np.full((batch, n + 1, m + 1), np.inf)
+    acc[:, 0, 0] = 0.0
+    slope = (m - 1) / (n - 1) if n > 1 else 0.0
+    for diag in range(n + m - 1):
+        i = np.arange(max(0, diag - m + 1), min(diag, n - 1) + 1)
+        j = diag - i
+        keep = np.abs(i * slope - j) <= band
+        i = i[keep]
+        j = j[keep]
+        if not len(i):
+            continue
+
+        best = np.minimum(np.minimum(acc[:, i, j + 1], acc[:, i, j]), acc[:, i + 1, j])
+        cell = costs[:, i, j]
+        acc[:, i + 1, j + 1] = cell + best if method == 'dtw' else np.maximum(cell, best)
+
+    return acc[:, n, m]
+
+def _pairwise_costs(query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    return np.linalg.norm(query[None, :, None, :] - candidates[:, None, :, :], axis=-1)
+
+def _check(query: np.ndarray, candidates: np.ndarray, method: str) -> None:
+    if method not in _METHODS:
+        raise ValueError('method must be one of ' + str(_METHODS) + ', got ' + repr(method))
+    if query.ndim != 2 or candidates.ndim != 3 or query.shape[1] != candidates.shape[2]:
+        raise ValueError('expected a (N, D) query and (B, M, D) candidates, got ' + str(query.shape) + ' and ' + str(candidates.shape))
+
+def _close(rings: np.ndarray) -> np.ndarray:
+    return np.concatenate([rings, rings[..., :1, :]], axis=-2)
+
+def _shifted_variants(query: np.ndarray, candidates: np.ndarray, shift_candidates: int | None, reverse: bool) -> np.ndarray:
+    """(B, S, M, D) closed candidates, rolled to the start phases worth warping"""
+    rings = candidates[:, :-1]
+    if reverse:
+        rings = np.concatenate([rings, rings[:, ::-1]], axis=0)
+
+    count = rings.shape[1]
+    index = (np.arange(count)[:, None] + np.arange(count)[None, :]) % count
+    rolled = rings[:, index]
+    if shift_candidates is not None and shift_candidates < count and len(query) == count + 1:
+        lock_step = np.mean(np.linalg.norm(rolled - query[None, None, :-1], axis=-1), axis=2)
+        best = np.argsort(lock_step, axis=1)[:, :shift_candidates]
+        rolled = np.take_along_axis(rolled, best[:, :, None, None], axis=1)
+
+    variants = _close(rolled)
+    if reverse:
+        half = len(candidates)
+        variants = np.concatenate([variants[:half], variants[half:]], axis=1)
+
+    return variants
+
+def elastic_distances(query: np.ndarray, candidates: np.ndarray, method: str ='dtw', band: float | None =0.1, cyclic: bool =False, shift_candidates: int | None =3, reverse: bool =False, chunk_size: int =256) -> np.ndarray:
+    """Distance from a (N, D) query curve to each of (B, M, D) candidates, warping within band (a fraction of the longer curve) of the diagonal"""
+    query = np.asarray(query, dtype=float)
+    candidates = np.asarray(candidates, dtype=float)
+    _check(query, candidates, method)
+    width = _band_width(band, len(query), candidates.shape[1])
+
+    res = np.empty(len(candidates))
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start:start + chunk_size]
+        if cyclic:
+            variants = _shifted_variants(query, chunk, shift_candidates, reverse)
+        else:
+            variants = chunk[:, None]
+            if reverse:
+                variants = np.concatenate([variants, chunk[:, None, ::-1]], axis=1)
+
+        flat = variants.reshape(-1, *variants.shape[2:])
+        warped = _warp(_pairwise_costs(query, flat), method, width)
+        res[start:start + len(chunk)] = warped.reshape(len(chunk), -1).min(axis=1)
+
+    return res
+
+def dtw_distance(curve1: np.ndarray, curve2: np.ndarray, band: float | None =0.1, cyclic: bool =False) -> float:
+    return float(elastic_distances(curve1, np.asarray(curve2)[None], 'dtw', band, cyclic)[0])
+
+def frechet_distance(curve1: np.ndarray, curve2: np.ndarray, band: float | None =None, cyclic: bool =False) -> float:
+    return float(elastic_distances(curve1, np.asarray(curve2)[None], 'frechet', band, cyclic)[0])
@@ -0,0 +1,169 @@
+"""Command line entry point, run with python -m mech_maker; subcommands import what they need"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any
+
+def _times(steps: int) -> list[float]:
+    return [val / (steps - 1) for val in range(steps)]
+
+def _load_mechanism(args: argparse.Namespace):
+    from .gcs.solver import ScipySLSQPSolver
+
+    if args.spec is not None:
+        from .gcs.spec import mechanism_from_spec
+        with open(args.spec) as spec_file:
+            return mechanism_from_spec(json.load(spec_file), ScipySLSQPSolver())
+
+    from .builders import build
+    return build(args.mechanism, ScipySLSQPSolver(), args.steps)
+
+def _write_json(data: Any, outfile: str | None) -> None:
+    if outfile is None:
+        json.dump(data, sys.stdout)
+        sys.stdout.write('\n')
+    else:
+        with open(outfile, 'w') as out:
+            json.dump(data, out)
+
+def _cmd_spec(args: argparse.Namespace) -> int:
+    from .gcs.spec import mechanism_to_spec
+    _write_json(mechanism_to_spec(_load_mechanism(args)), args.output)
+    return 0
+
+def _cmd_solve(args: argparse.Namespace) -> int:
+    mech = _load_mechanism(args)
+    out = sys.stdout if args.output is None else open(args.output, 'w')
+    failed = 0
+    try:
+        for frame in mech.iter_solve(_times(args.steps)):
+            failed = failed + (0 if frame.success else 1)
+            record = {'time': frame.time, 'success': frame.success, 'track_points': [[float(coord) for coord in point] for point in frame.track_points]}
+            out.write(json.dumps(record) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.trajectory is not None:
+        mech.trajectory().save_npz(args.trajectory)
+
+    return 1 if failed else 0
+
+def _cmd_features(args: argparse.Namespace) -> int:
+    from .analyzer.features import CurveFeature
+
+    mech = _load_mechanism(args)
+    solved = mech.solve_times(_times(args.steps), None)
+    if not any(solved):
+        print('no time steps solved', file=sys.stderr)
+        return 1
+
+    c_fs = [CurveFeature(curve, args.samples) for curve in mech.curves()]
+    for i, c_f in enumerate(c_fs):
+        print('curve:')
+        print(i)
+        print([float(val) for val in c_f.features])
+        for o_c_f in c_fs[i+1:]:
+            print(float(c_f.compare(o_c_f)))
+
+    return 0
+
+def _cmd_animate(args: argparse.Namespace) -> int:
+    from .generics import Vec3
+    from .gui.animator import MPEGAnimator
+
+    mech = _load_mechanism(args)
+    animator = MPEGAnimator(Vec3(*args.normal), args.output, args.fps, tuple(args.xlim), tuple(args.ylim))
+    try:
+        for frame in mech.iter_solve(_times(args.steps), history=True):
+            if frame.success:
+                animator.write_frame(list(frame.shapes()), list(frame.curves()))
+    finally:
+        animator.finish()
+
+    return 0
+
+def _cmd_sweep(args: argparse.Namespace) -> int:
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from .jobs import solve_spec
+
+    specs = []
+    for path in args.specs:
+        with open(path) as spec_file:
+            specs.append(json.load(spec_file))
+
+    times = _times(args.steps)
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        results = pool.map(solve_spec, specs, [times] * len(specs), [args.samples] * len(specs))
+        for path, result in zip(args.specs, results):
+            solved = sum(1 for frame in result['frames'] if frame['success'])
+            failed = failed + (1 if solved < len(times) else 0)
+            print(json.dumps({'spec': path, 'solved': solved, 'steps': len(times), 'features': result['features']}))
+
+    return 1 if failed else 0
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    from .server import main as serve_main
+
+    serve_main(args.server_args)
+    return 0
+
+def _add_mechanism_args(parser: argparse.ArgumentParser) -> None:
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--mechanism', default='crank_rocker_rotated', help='name of a built in example mechanism')
+    source.add_argument('--spec', default=None, help='path to a JSON mechanism spec')
+    parser.add_argument('--steps', type=int, default=20)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='mech_maker', description='solve, analyze and animate mechanisms')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    spec = subparsers.add_parser('spec', help='write the JSON spec of a mechanism')
+    _add_mechanism_args(spec)
+    spec.add_argument('--output', default=None)
+    spec.set_defaults(func=_cmd_spec)
+
+    solve = subparsers.add_parser('solve', help='solve a mechanism and write track points as JSON lines')
+    _add_mechanism_args(solve)
+    solve.add_argument('--output', default=None)
+    solve.add_argument('--trajectory', default=None, help='also write the solved states to this .npz file')
+    solve.set_defaults(func=_cmd_solve)
+
+    features = subparsers.add_parser('features', help='print curve features of each track point')
+    _add_mechanism_args(features)
+    features.add_argument('--samples', type=int, default=15)
+    features.set_defaults(func=_cmd_features)
+
+    animate = subparsers.add_parser('animate', help='render a solved mechanism to an MPEG file')
+    _add_mechanism_args(animate)
+    animate.add_argument('--output', required=True)
+    animate.add_argument('--normal', type=float, nargs=3, default=[0.0, 0.0, 1.0])
+    animate.add_argument('--fps', type=int, default=5)
+    animate.add_argument('--xlim', type=float, nargs=2, default=[-7.0, 7.0])
+    animate.add_argument('--ylim', type=float, nargs=2, default=[-7.0, 7.0])
+    animate.set_defaults(func=_cmd_animate)
+
+    sweep = subparsers.add_parser('sweep', help='solve many specs on a process pool')
+    sweep.add_argument('specs', nargs='+')
+    sweep.add_argument('--steps', type=int, default=20)
+    sweep.add_argument('--samples', type=int, default=15)
+    sweep.add_argument('--workers', type=int, default=None)
+    sweep.set_defaults(func=_cmd_sweep)
+
+    serve = subparsers.add_parser('serve', help='run the batch solve job server')
+    serve.add_argument('server_args', nargs=argparse.REMAINDER)
+    serve.set_defaults(func=_cmd_serve)
+
+    return parser
+
+def main(argv: list[str] | None =None) -> int:
+    import numpy as np
+    np.seterr('raise')
+
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Generator, Callable
+import numpy as np
 
 from .generics import Vec3
 
@@ -10,19 +11,113 @@ class CurvePoint:
         self.velocity = velocity
 
 class Curve:
+    """Sampled curve backed by (N, 3) location and velocity arrays; transforms return new curves"""
     def __init__(self, points: list[CurvePoint]) -> None:
-        self._points = points
-        self._total_length = -1.0
+        self._locations = np.array([[float(coord) for coord in point.location] for point in points], dtype=float).reshape(-1, 3)
+        self._velocities = np.array([[float(coord) for coord in point.velocity] for point in points], dtype=float).reshape(-1, 3)
+        self._times: np.ndarray | None = None
+        self._cache: dict[str, np.ndarray | float] = {}
+
+    @staticmethod
+    def from_arrays(locations: np.ndarray, velocities: np.ndarray | None =None, times: np.ndarray | None =None) -> Curve:
+        curve = Curve([])
+        curve._locations = np.asarray(locations, dtype=float).reshape(-1, 3)
+        curve._velocities = np.zeros_like(curve._locations) if velocities is None else np.asarray(velocities, dtype=float).reshape(-1, 3)
+        curve._times = None if times is None else np.asarray(times, dtype=float)
+        return curve
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def locations(self) -> np.ndarray:
+        return self._locations
+
+    def velocities(self) -> np.ndarray:
+        return self._velocities
+
+    def times(self) -> np.ndarray | None:
+        """Time of each sample, when the curve came from a solved mechanism"""
+        return self._times
 
     def points(self) -> Generator[CurvePoint, None, None]:
-        return (point for point in self._points)
+        return (CurvePoint(Vec3(*location), Vec3(*velocity)) for location, velocity in zip(self._locations.tolist(), self._velocities.tolist()))
+
+    def arc_lengths(self) -> np.ndarray:
+        """Cumulative length along the curve at each sample, starting at 0"""
+        if 'arc_lengths' not in self._cache:
+            seg_lengths = np.linalg.norm(np.diff(self._locations, axis=0), axis=1)
+            self._cache['arc_lengths'] = np.concatenate([[0.0], np.cumsum(seg_lengths)])
+
+        return self._cache['arc_lengths']
 
     def total_length(self) -> float:
-        if self._total_length > 0:
-            return self._total_length
+        return float(self.arc_lengths()[-1]) if len(self) else 0.0
+
+    def bounding_box(self) -> tuple[np.ndarray, np.ndarray]:
+        if 'bounds' not in self._cache:
+            self._cache['bounds'] = np.stack([self._locations.min(axis=0), self._locations.max(axis=0)])
+
+        return self._cache['bounds'][0], self._cache['bounds'][1]
+
+    def is_closed(self, tolerance: float =1e-2) -> bool:
+        """Whether the ends meet, within tolerance of the bounding box diagonal"""
+        if len(self) < 2:
+            return False
+
+        low, high = self.bounding_box()
+        extent = np.linalg.norm(high - low)
+        return bool(np.linalg.norm(self._locations[0] - self._locations[-1]) <= tolerance * max(extent, 1e-12))
+
+    def curvature(self) -> np.ndarray:
+        """Curvature of the circle through each sample and its neighbours, 0 at the ends of open curves"""
+        if 'curvature' not in self._cache:
+            locations = self._locations
+            closed = self.is_closed()
+            if closed:
+                # the last sample repeats the first
+                locations = locations[:-1]
+
+            res = np.zeros(len(locations))
+            if len(locations) >= 3:
+                prev = np.roll(locations, 1, axis=0)
+                next = np.roll(locations, -1, axis=0)
+                side1 = np.linalg.norm(locations - prev, axis=1)
+                side2 = np.linalg.norm(next - locations, axis=1)
+                side3 = np.linalg.norm(next - prev, axis=1)
+                double_area = np.linalg.norm(np.cross(locations - prev, next - locations), axis=1)
+                denom = side1 * side2 * side3
+                res = np.divide(2 * double_area, denom, out=np.zeros_like(denom), where=denom > 0)
+                if not closed:
+                    res[0] = 0.0
+                    res[-1] = 0.0
+
+            self._cache['curvature'] = np.append(res, res[:1]) if closed else res
+
+        return self._cache['curvature']
+
+    def _derived(self, locations: np.ndarray, velocities: np.ndarray) -> Curve:
+        return Curve.from_arrays(locations, velocities, self._times)
+
+    def translated(self, offset: np.ndarray) -> Curve:
+        """Curve with every location moved by offset; velocities are unchanged"""
+        return self._derived(self._locations + offset, self._velocities)
+
+    def rotated(self, rotation: np.ndarray) -> Curve:
+        """Curve with locations and velocities rotated by a 3x3 matrix"""
+        rotation = np.asarray(rotation)
+        return self._derived(self._locations @ rotation.T, self._velocities @ rotation.T)
+
+    def scaled(self, factor: float) -> Curve:
+        return self._derived(self._locations * factor, self._velocities * factor)
 
-        self._total_length = sum([(v2.location - v1.location).magnitude() for v1, v2 in zip(self._points, self._points[1:])])
-        return self._total_length
+    def resampled(self, num_samples: int) -> Curve:
+        """num_samples points equally spaced in arc length, interpolating velocities (and times) linearly"""
+        arc = self.arc_lengths()
+        samples = np.linspace(0.0, arc[-1], num_samples)
+        locations = np.stack([np.interp(samples, arc, self._locations[:, axis]) for axis in range(3)], axis=1)
+        velocities = np.stack([np.interp(samples, arc, self._velocities[:, axis]) for axis in range(3)], axis=1)
+        times = None if self._times is None else np.interp(samples, arc, self._times)
+        return Curve.from_arrays(locations, velocities, times)
 
     def transform(self, callback: Callable[[CurvePoint], CurvePoint]) -> Curve:
-        return Curve([callback(point) for point in self._points])
\ No newline at end of file
+        return Curve([callback(point) for point in self.points()])
@@ -0,0 +1,53 @@
+"""Quaternion and rotation helpers over stacked (..., 4) (w, x, y, z) arrays"""
+
+from __future__ import annotations
+
+import numpy as np
+
+def normalized(vals: np.ndarray) -> np.ndarray:
+    return vals / np.linalg.norm(vals, axis=-1, keepdims=True)
+
+def quat_mult(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack([aw * bw - ax * bx - ay * by - az * bz,
+                     aw * bx + ax * bw + ay * bz - az * by,
+                     aw * by - ax * bz + ay * bw + az * bx,
+                     aw * bz + ax * by - ay * bx + az * bw], axis=-1)
+
+def quat_inverse(q: np.ndarray) -> np.ndarray:
+    return q * np.array([1.0, -1.0, -1.0, -1.0])
+
+def rotation_matrices(q: np.ndarray) -> np.ndarray:
+    """Rotation matrices, shaped (..., 3, 3), in the general q p q* form of member._rotation_matrix"""
+    w, x, y, z = np.moveaxis(q, -1, 0)
+    return np.stack([np.stack([w * w + x * x - y * y - z * z, 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=-1),
+                     np.stack([2 * (x * y + w * z), w * w - x * x + y * y - z * z, 2 * (y * z - w * x)], axis=-1),
+                     np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), w * w - x * x - y * y + z * z], axis=-1)], axis=-2)
+
+def quat_slerp(q1: np.ndarray, q2: np.ndarray, ratio: np.ndarray | float) -> np.ndarray:
+    """Element wise Quaternion.slerp, along the shorter arc and lerping nearly identical rotations"""
+    ratio = np.asarray(ratio, dtype=float)[..., None]
+    dot = np.sum(q1 * q2, axis=-1, keepdims=True)
+    q2 = np.where(dot < 0, -q2, q2)
+    dot = np.abs(dot)
+    close = dot > 0.9995
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.where(close, 1.0, np.sin(theta))
+    scale1 = np.where(close, 1 - ratio, np.sin((1 - ratio) * theta) / sin_theta)
+    scale2 = np.where(close, ratio, np.sin(ratio * theta) / sin_theta)
+    res = q1 * scale1 + q2 * scale2
+    return np.where(close, normalized(res), res)
+
+def quat_interp(q1: np.ndarray, q2: np.ndarray, ratio: np.ndarray | float) -> np.ndarray:
+    """Element wise Quaternion.interp, which unlike quat_slerp does not fold onto the shorter arc"""
+    ratio = np.asarray(ratio, dtype=float)
+    diff = normalized(quat_mult(q2, quat_inverse(q1)))
+    angle = 2 * np.arccos(np.clip(diff[..., 0], -1.0, 1.0))
+    half = (angle * ratio)[..., None] / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        axis = normalized(diff[..., 1:])
+    vector = axis * np.sin(half)
+    step = np.concatenate([np.broadcast_to(np.cos(half), vector.shape[:-1] + (1,)), vector], axis=-1)
+    step = np.where(half == 0, np.array([1.0, 0.0, 0.0, 0.0]), step)
+    return normalized(quat_mult(normalized(step), q1))
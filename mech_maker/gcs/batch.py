@@ -0,0 +1,294 @@
+"""Vectorized solving of many mechanisms that share one topology"""
+
+from __future__ import annotations
+
+from typing import Any, Type
+import numpy as np
+
+from .arrays import normalized, quat_interp, quat_inverse, quat_mult, rotation_matrices
+from .constraint import Constraint, OnPlaneConstraint, PlaneEquation, StandardConstraint
+from . import constraint as cons
+from .inputs import MechanismInput
+from .kinematics import color_members
+from .mechanism import Mechanism
+
+_RAW_WIDTH = 7
+
+# residual blocks each built in constraint type contributes, one per params pair
+_TERM_KINDS: dict[Type[StandardConstraint], tuple[str, ...]] = {
+    cons.RelativeLocationConstraint: ('location',),
+    cons.RelativeOrientationConstraint: ('orientation',),
+    cons.RelativeAxisAlignedConstraint: ('unit_axis',),
+    cons.RelativePinConstraint: ('location', 'unit_axis'),
+    cons.FixedLocationConstraint: ('location',),
+    cons.FixedOrientationConstraint: ('orientation',),
+    cons.FixedAxisAlignedConstraint: ('axis',),
+    cons.FixedPinConstraint: ('location', 'axis'),
+    cons.FixedAllConstraint: ('location', 'orientation'),
+}
+
+_TERM_SIZES = {'location': 3, 'orientation': 3, 'axis': 3, 'plane': 1}
+
+def _interp_params(start: np.ndarray, end: np.ndarray, ratio: np.ndarray) -> np.ndarray:
+    if start.shape[1] == 4:
+        return quat_interp(start, end, ratio)
+
+    return start * (1 - ratio)[:, None] + end * ratio[:, None]
+
+class _Term:
+    """One location, orientation, axis or plane residual block with per instance parameters"""
+    def __init__(self, kind: str, members: tuple[int, ...], first: np.ndarray, second: np.ndarray, active: np.ndarray | None =None) -> None:
+        self.kind = kind
+        self.members = members
+        self.first = first
+        self.second = second
+        self.active = active
+
+    @property
+    def size(self) -> int:
+        return _TERM_SIZES[self.kind]
+
+    def residuals(self, rows: np.ndarray, locations: np.ndarray, orientations: np.ndarray, matrices: np.ndarray) -> np.ndarray:
+        first = self.first[rows]
+        second = self.second[rows]
+        index1 = self.members[0]
+        if self.kind == 'orientation':
+            q1 = normalized(quat_mult(orientations[:, index1], first))
+            q2 = normalized(quat_mult(orientations[:, self.members[1]], second)) if len(self.members) == 2 else second
+            dif = normalized(quat_mult(q2, quat_inverse(q1)))
+            res = dif[:, 1:] * np.where(dif[:, 0] >= 0, 2.0, -2.0)[:, None]
+        elif self.kind == 'plane':
+            point = np.einsum('nij,nj->ni', matrices[:, index1], first) + locations[:, index1]
+            res = (np.sum(second[:, :3] * point, axis=1) - second[:, 3])[:, None]
+        else:
+            translate = self.kind == 'location'
+            point1 = np.einsum('nij,nj->ni', matrices[:, index1], first)
+            if translate:
+                point1 = point1 + locations[:, index1]
+            if len(self.members) == 2:
+                point2 = np.einsum('nij,nj->ni', matrices[:, self.members[1]], second)
+                if translate:
+                    point2 = point2 + locations[:, self.members[1]]
+            else:
+                point2 = second
+            res = point1 - point2
+
+        if self.active is not None:
+            res = res * self.active[rows][:, None]
+
+        return res
+
+def _pair_arrays(pairs: list[tuple[Any, Any]]) -> tuple[np.ndarray, np.ndarray]:
+    return (np.array([[float(coord) for coord in pair[0]] for pair in pairs]), np.array([[float(coord) for coord in pair[1]] for pair in pairs]))
+
+def _standard_terms(constraint_type: Type[StandardConstraint], members: tuple[int, ...], params: list[tuple[np.ndarray, np.ndarray]], active: np.ndarray | None =None) -> list[_Term]:
+    if constraint_type not in _TERM_KINDS:
+        raise TypeError('constraint type ' + constraint_type.__name__ + ' cannot be batched')
+
+    terms = []
+    for kind, (first, second) in zip(_TERM_KINDS[constraint_type], params):
+        if kind == 'unit_axis':
+            kind, first, second = 'axis', normalized(first), normalized(second)
+        terms.append(_Term(kind, members, first, second, active))
+
+    return terms
+
+class _InputSchedule:
+    """The stacked inputs at one position of every mechanism in the batch"""
+    def __init__(self, inputs: list[MechanismInput], members: tuple[int, ...]) -> None:
+        self.constraint_type = inputs[0].constraint_type
+        self.members = members
+        self.regions = np.array([[float(bound) for bound in input.time_region] for input in inputs])
+        self.starts = [_pair_arrays([input.params()[index].start_params for input in inputs]) for index in range(len(inputs[0].params()))]
+        self.ends = [_pair_arrays([input.params()[index].end_params for input in inputs]) for index in range(len(inputs[0].params()))]
+
+    def terms(self, time: float) -> list[_Term]:
+        active = (time >= self.regions[:, 0]) & (time <= self.regions[:, 1])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = (time - self.regions[:, 0]) / (self.regions[:, 1] - self.regions[:, 0])
+        ratio = np.where(active, ratio, 0.0)
+        params = [(_interp_params(start[0], end[0], ratio), _interp_params(start[1], end[1], ratio)) for start, end in zip(self.starts, self.ends)]
+        return _standard_terms(self.constraint_type, self.members, params, active.astype(float))
+
+def _constraint_key(mech: Mechanism, constraint: Constraint) -> tuple:
+    return (type(constraint), tuple(mech.member_id(member) for member in constraint.members()))
+
+class BatchSolver:
+    """Solves K mechanisms of one topology at once with vectorized Levenberg-Marquardt, failed instances keep their last good state"""
+    def __init__(self, mechs: list[Mechanism], tolerance: float =1e-10, max_iterations: int =100, step: float =1e-6) -> None:
+        if not len(mechs):
+            raise ValueError('a batch needs at least one mechanism')
+
+        self._tolerance = tolerance
+        self._max_iterations = max_iterations
+        self._step = step
+        template = mechs[0]
+        self._member_count = len(list(template.members()))
+        for index, mech in enumerate(mechs):
+            if len(list(mech.members())) != self._member_count:
+                raise ValueError('mechanism ' + str(index) + ' does not share the topology of mechanism 0')
+
+        self._terms = self._compile_constraints(mechs)
+        self._inputs = self._compile_inputs(mechs)
+        self._track_members = [template.member_id(point.member) for point in template.track_points()]
+        track_points = [list(mech.track_points()) for mech in mechs]
+        if any([[mech.member_id(point.member) for point in points] != self._track_members for mech, points in zip(mechs, track_points)]):
+            raise ValueError('track points do not share the topology of mechanism 0')
+        self._track_locations = [np.array([[float(coord) for coord in points[index].location] for points in track_points]) for index in range(len(self._track_members))]
+
+        self._states = np.array([[float(val) for member in mech.members() for val in [*member.location, *normalized(np.array([float(coord) for coord in member.orientation]))]] for mech in mechs])
+        self._groups = color_members(self._member_count, [term.members for term in self._terms] + [schedule.members for schedule in self._inputs])
+        self.iterations = 0
+
+    @staticmethod
+    def from_specs(specs: list[dict[str, Any]], tolerance: float =1e-10, max_iterations: int =100, step: float =1e-6) -> BatchSolver:
+        from .solver import ScipySLSQPSolver
+        from .spec import mechanism_from_spec
+
+        # the per mechanism solver is never called
+        return BatchSolver([mechanism_from_spec(spec, ScipySLSQPSolver()) for spec in specs], tolerance, max_iterations, step)
+
+    def _compile_constraints(self, mechs: list[Mechanism]) -> list[_Term]:
+        per_mech = [list(mech.constraints()) for mech in mechs]
+        template = mechs[0]
+        terms = []
+        for position, constraint in enumerate(per_mech[0]):
+            key = _constraint_key(template, constraint)
+            if any(len(constraints) != len(per_mech[0]) or _constraint_key(mech, constraints[position]) != key for mech, constraints in zip(mechs, per_mech)):
+                raise ValueError('constraints do not share the topology of mechanism 0')
+
+            members = key[1]
+            stacked = [constraints[position] for constraints in per_mech]
+            if isinstance(constraint, OnPlaneConstraint):
+                planes = [other.plane_eq for other in stacked]
+                if not all(isinstance(plane, PlaneEquation) for plane in planes):
+                    raise TypeError('only PlaneEquation planes can be batched')
+
+                first = np.array([[float(coord) for coord in other.local_location] for other in stacked])
+                second = np.array([[*[float(coord) for coord in plane.normal], float(plane.offset)] for plane in planes])
+                terms.append(_Term('plane', members, first, second))
+            elif isinstance(constraint, StandardConstraint):
+                params = [_pair_arrays([other.params()[index] for other in stacked]) for index in range(len(constraint.params()))]
+                terms.extend(_standard_terms(type(constraint), members, params))
+            else:
+                raise TypeError('constraint type ' + type(constraint).__name__ + ' cannot be batched')
+
+        return terms
+
+    def _compile_inputs(self, mechs: list[Mechanism]) -> list[_InputSchedule]:
+        per_mech = [list(mech.inputs()) for mech in mechs]
+        template = mechs[0]
+        schedules = []
+        for position, input in enumerate(per_mech[0]):
+            key = (type(input), input.constraint_type, tuple(template.member_id(member) for member in input.members()), len(input.params()))
+            for mech, inputs in zip(mechs, per_mech):
+                other = inputs[position] if len(inputs) == len(per_mech[0]) else None
+                if other is None or (type(other), other.constraint_type, tuple(mech.member_id(member) for member in other.members()), len(other.params())) != key:
+                    raise ValueError('inputs do not share the topology of mechanism 0')
+
+            schedules.append(_InputSchedule([inputs[position] for inputs in per_mech], key[2]))
+
+        return schedules
+
+    @property
+    def size(self) -> int:
+        return len(self._states)
+
+    def raw_states(self) -> np.ndarray:
+        return self._states.copy()
+
+    def seed_states(self, states: np.ndarray) -> None:
+        """Use states, shaped (K, D), as the initial guesses for the next solve"""
+        states = np.asarray(states, dtype=float)
+        if states.shape != self._states.shape:
+            raise ValueError('states must have shape ' + str(self._states.shape) + ', got ' + str(states.shape))
+
+        self._states = states.copy()
+
+    def _residuals(self, terms: list[_Term], states: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        raw = states.reshape(len(states), self._member_count, _RAW_WIDTH)
+        orientations = normalized(raw[:, :, 3:])
+        matrices = rotation_matrices(orientations)
+        return np.concatenate([term.residuals(rows, raw[:, :, :3], orientations, matrices) for term in terms], axis=1)
+
+    def _jacobian(self, terms: list[_Term], states: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        member_rows: list[list[int]] = [[] for _ in range(self._member_count)]
+        row = 0
+        for term in terms:
+            for member in term.members:
+                member_rows[member].extend(range(row, row + term.size))
+            row = row + term.size
+
+        # members sharing no term are perturbed together, see kinematics.constraint_jacobian
+        jac = np.zeros((len(states), row, states.shape[1]))
+        for group in self._groups:
+            for offset in range(_RAW_WIDTH):
+                columns = [member * _RAW_WIDTH + offset for member in group]
+                forward = states.copy()
+                forward[:, columns] += self._step
+                backward = states.copy()
+                backward[:, columns] -= self._step
+                diff = (self._residuals(terms, forward, rows) - self._residuals(terms, backward, rows)) / (2 * self._step)
+                for member, column in zip(group, columns):
+                    jac[:, member_rows[member], column] = diff[:, member_rows[member]]
+
+        return jac
+
+    def _normalize_states(self, states: np.ndarray) -> np.ndarray:
+        raw = states.reshape(len(states), self._member_count, _RAW_WIDTH).copy()
+        raw[:, :, 3:] = normalized(raw[:, :, 3:])
+        return raw.reshape(states.shape)
+
+    def solve_time(self, time: float) -> np.ndarray:
+        """Solve every instance at time, returning a (K,) success mask"""
+        terms = self._terms + [term for schedule in self._inputs for term in schedule.terms(time)]
+        all_rows = np.arange(self.size)
+        states = self._normalize_states(self._states)
+        cost = np.sum(self._residuals(terms, states, all_rows) ** 2, axis=1)
+        damping = np.full(self.size, 1e-3)
+        pending = cost > self._tolerance
+        identity = np.eye(states.shape[1])
+
+        for _ in range(self._max_iterations):
+            rows = np.nonzero(pending)[0]
+            if not len(rows):
+                break
+
+            self.iterations = self.iterations + 1
+            current = states[rows]
+            res = self._residuals(terms, current, rows)
+            jac = self._jacobian(terms, current, rows)
+            jac_t = np.transpose(jac, (0, 2, 1))
+            # the damping also fixes the quaternion scale directions, which J does not see
+            lhs = jac_t @ jac + damping[rows][:, None, None] * identity
+            delta = np.linalg.solve(lhs, -(jac_t @ res[:, :, None]))[:, :, 0]
+            trial = self._normalize_states(current + delta)
+            trial_cost = np.sum(self._residuals(terms, trial, rows) ** 2, axis=1)
+
+            better = trial_cost < cost[rows]
+            states[rows[better]] = trial[better]
+            cost[rows[better]] = trial_cost[better]
+            damping[rows] = np.where(better, damping[rows] / 3, damping[rows] * 4)
+            pending[rows] = (cost[rows] > self._tolerance) & (damping[rows] < 1e10)
+
+        success = cost <= self._tolerance
+        self._states[success] = states[success]
+        return success
+
+    def solve_times(self, times: list[float]) -> tuple[np.ndarray, np.ndarray]:
+        """Solve each time in order, returning (T, K) success masks and (T, K, D) raw states"""
+        successes = []
+        states = []
+        for time in times:
+            successes.append(self.solve_time(time))
+            states.append(self.raw_states())
+
+        return np.array(successes, dtype=bool).reshape(len(times), self.size), np.array(states).reshape(len(times), *self._states.shape)
+
+    def track_point_locations(self, states: np.ndarray | None =None) -> np.ndarray:
+        """Global track point locations, shaped (K, P, 3), of the given or current raw states"""
+        states = self._states if states is None else np.asarray(states, dtype=float)
+        raw = states.reshape(len(states), self._member_count, _RAW_WIDTH)
+        matrices = rotation_matrices(normalized(raw[:, :, 3:]))
+        points = [np.einsum('nij,nj->ni', matrices[:, member], location) + raw[:, member, :3] for member, location in zip(self._track_members, self._track_locations)]
+        return np.stack(points, axis=1) if len(points) else np.zeros((len(states), 0, 3))
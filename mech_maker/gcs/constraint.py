@@ -18,16 +18,51 @@ def _axis_eval(axis1: Vec3, axis2: Vec3) -> float:
     ang_dif = axis1.angle_to(axis2)
     return ang_dif * ang_dif
 
+def _location_residuals(location1: Vec3, location2: Vec3) -> list[float]:
+    return list(location1 - location2)
+
+def _orientation_residuals(orientation1: Quaternion, orientation2: Quaternion) -> list[float]:
+    # vector part of the relative rotation, approximately axis * angle near zero
+    dif = orientation2.quat_div(orientation1, True)
+    scale = 2.0 if dif.w >= 0 else -2.0
+    return [dif.x * scale, dif.y * scale, dif.z * scale]
+
+def _axis_residuals(axis1: Vec3, axis2: Vec3) -> list[float]:
+    return list(axis1 - axis2)
+
 class Constraint(ABC):
     @abstractmethod
     def eval(self) -> float:
         pass
 
+    @abstractmethod
+    def members(self) -> tuple[Member, ...]:
+        pass
+
+    @abstractmethod
+    def residuals(self) -> list[float]:
+        """Smooth residual vector that vanishes exactly when the constraint is satisfied"""
+        pass
+
+    def dof(self) -> int:
+        """Number of degrees of freedom the constraint nominally removes"""
+        return len(self.residuals())
+
 class StandardConstraint(Constraint):
     def __init__(self, members: tuple[Member] | tuple[Member, Member], *params: tuple[MultiD, MultiD]) -> None:
         self._members = members
         self._params = params
 
+    def members(self) -> tuple[Member] | tuple[Member, Member]:
+        return self._members
+
+    def params(self) -> tuple[tuple[MultiD, MultiD], ...]:
+        return self._params
+
+    def retarget(self, *params: tuple[MultiD, MultiD]) -> None:
+        """Replace the params in place, for driver constraints reused across solve steps"""
+        self._params = params
+
 class GroupConstraint(Constraint):
     @abstractmethod
     def __init__(self, *sub_constraints: Constraint) -> None:
@@ -36,6 +71,21 @@ class GroupConstraint(Constraint):
     def eval(self) -> float:
         return sum([constraint.eval() for constraint in self._sub_constraints])
 
+    def residuals(self) -> list[float]:
+        res = []
+        for constraint in self._sub_constraints:
+            res.extend(constraint.residuals())
+
+        return res
+
+    def dof(self) -> int:
+        return sum([constraint.dof() for constraint in self._sub_constraints])
+
+    def retarget(self, *params: tuple[MultiD, MultiD]) -> None:
+        """Retarget each sub constraint with its own param pair"""
+        for constraint, param in zip(self._sub_constraints, params):
+            constraint.retarget(param)
+
 class RelativeConstraint(StandardConstraint):
     def __init__(self, member1: Member, member2: Member, *params: tuple[MultiD, MultiD]) -> None:
         super().__init__((member1, member2), *params)
@@ -51,6 +101,9 @@ class RelativeLocationConstraint(RelativeConstraint):
     def eval(self) -> float:
         return _location_eval(self._members[0].relative_location(self._locations[0]), self._members[1].relative_location(self._locations[1]))
 
+    def residuals(self) -> list[float]:
+        return _location_residuals(self._members[0].relative_location(self._locations[0]), self._members[1].relative_location(self._locations[1]))
+
 class RelativeOrientationConstraint(RelativeConstraint):
     def __init__(self, member1: Member, member2: Member, orientations: tuple[Quaternion, Quaternion]) -> None:
         super().__init__(member1, member2, orientations)
@@ -62,23 +115,42 @@ class RelativeOrientationConstraint(RelativeConstraint):
     def eval(self) -> float:
         return _orientation_eval(self._members[0].relative_orientation(self._orientations[0]), self._members[1].relative_orientation(self._orientations[1]))
 
+    def residuals(self) -> list[float]:
+        return _orientation_residuals(self._members[0].relative_orientation(self._orientations[0]), self._members[1].relative_orientation(self._orientations[1]))
+
 class RelativeAxisAlignedConstraint(RelativeConstraint):
     def __init__(self, member1: Member, member2: Member, axes: tuple[Vec3, Vec3]) -> None:
-        super().__init__(member1, member2, tuple(axis.normalized() for axis in axes))
+        super().__init__(member1, member2, axes)
+        self._unit_axes = tuple(axis.normalized() for axis in axes)
+
+    def retarget(self, axes: tuple[Vec3, Vec3]) -> None:
+        super().retarget(axes)
+        self._unit_axes = tuple(axis.normalized() for axis in axes)
 
     @property
     def _axes(self) -> tuple[Vec3, Vec3]:
-        return self._params[0]
+        return self._unit_axes
 
     def eval(self) -> float:
         return _axis_eval(self._members[0].relative_axis(self._axes[0]), self._members[1].relative_axis(self._axes[1]))
 
+    def residuals(self) -> list[float]:
+        return _axis_residuals(self._members[0].relative_axis(self._axes[0]), self._members[1].relative_axis(self._axes[1]))
+
+    def dof(self) -> int:
+        return 2
+
 class RelativePinConstraint(GroupConstraint, RelativeConstraint):
     def __init__(self, member1: Member, member2: Member, locations: tuple[Vec3, Vec3], axes: tuple[Vec3, Vec3]) -> None:
+        RelativeConstraint.__init__(self, member1, member2, locations, axes)
         location_constraint = RelativeLocationConstraint(member1, member2, locations)
         orientation_constraint = RelativeAxisAlignedConstraint(member1, member2, axes)
         GroupConstraint.__init__(self, location_constraint, orientation_constraint)
 
+    def retarget(self, locations: tuple[Vec3, Vec3], axes: tuple[Vec3, Vec3]) -> None:
+        RelativeConstraint.retarget(self, locations, axes)
+        GroupConstraint.retarget(self, locations, axes)
+
 class FixedConstraint(StandardConstraint):
     def __init__(self, member: Member, *params: tuple[MultiD, MultiD]) -> None:
         super().__init__((member,), *params)
@@ -102,6 +174,9 @@ class FixedLocationConstraint(FixedConstraint):
     def eval(self) -> float:
         return _location_eval(self._member.relative_location(self._local), self._global)
 
+    def residuals(self) -> list[float]:
+        return _location_residuals(self._member.relative_location(self._local), self._global)
+
 class FixedOrientationConstraint(FixedConstraint):
     def __init__(self, member: Member, orientations: tuple[Quaternion, Quaternion]) -> None:
         super().__init__(member, orientations)
@@ -109,6 +184,9 @@ class FixedOrientationConstraint(FixedConstraint):
     def eval(self) -> float:
         return _orientation_eval(self._member.relative_orientation(self._local), self._global)
 
+    def residuals(self) -> list[float]:
+        return _orientation_residuals(self._member.relative_orientation(self._local), self._global)
+
 class FixedAxisAlignedConstraint(FixedConstraint):
     def __init__(self, member: Member, axes: tuple[Vec3, Vec3]) -> None:
         super().__init__(member, axes)
@@ -116,24 +194,63 @@ class FixedAxisAlignedConstraint(FixedConstraint):
     def eval(self) -> float:
         return _axis_eval(self._member.relative_axis(self._local), self._global)
 
+    def residuals(self) -> list[float]:
+        return _axis_residuals(self._member.relative_axis(self._local), self._global)
+
+    def dof(self) -> int:
+        return 2
+
 class FixedPinConstraint(GroupConstraint, FixedConstraint):
     def __init__(self, member: Member, locations: tuple[Vec3, Vec3], axes: tuple[Vec3, Vec3]) -> None:
+        FixedConstraint.__init__(self, member, locations, axes)
         location_constraint = FixedLocationConstraint(member, locations)
         orientation_constraint = FixedAxisAlignedConstraint(member, axes)
         GroupConstraint.__init__(self, location_constraint, orientation_constraint)
 
+    def retarget(self, locations: tuple[Vec3, Vec3], axes: tuple[Vec3, Vec3]) -> None:
+        FixedConstraint.retarget(self, locations, axes)
+        GroupConstraint.retarget(self, locations, axes)
+
 class FixedAllConstraint(GroupConstraint, FixedConstraint):
     def __init__(self, member: Member, locations: tuple[Vec3, Vec3], orientations: tuple[Quaternion, Quaternion]) -> None:
+        FixedConstraint.__init__(self, member, locations, orientations)
         location_constraint = FixedLocationConstraint(member, locations)
         orientation_constraint = FixedOrientationConstraint(member, orientations)
         GroupConstraint.__init__(self, location_constraint, orientation_constraint)
 
+    def retarget(self, locations: tuple[Vec3, Vec3], orientations: tuple[Quaternion, Quaternion]) -> None:
+        FixedConstraint.retarget(self, locations, orientations)
+        GroupConstraint.retarget(self, locations, orientations)
+
+class PlaneEquation:
+    """Picklable plane equation of the form normal . p - offset"""
+    def __init__(self, normal: Vec3, offset: float) -> None:
+        self.normal = normal
+        self.offset = offset
+
+    def __call__(self, location: Vec3) -> float:
+        return self.normal.dot(location) - self.offset
+
 class OnPlaneConstraint(Constraint):
     def __init__(self, member: Member, local_location: Vec3, plane_eq: Callable[[Vec3], float]) -> None:
         self._member = member
         self._local_location = local_location
         self._plane_eq = plane_eq
 
+    def members(self) -> tuple[Member]:
+        return (self._member,)
+
+    @property
+    def local_location(self) -> Vec3:
+        return self._local_location
+
+    @property
+    def plane_eq(self) -> Callable[[Vec3], float]:
+        return self._plane_eq
+
     def eval(self) -> float:
         plane_dif = self._plane_eq(self._member.relative_location(self._local_location))
-        return plane_dif * plane_dif
\ No newline at end of file
+        return plane_dif * plane_dif
+
+    def residuals(self) -> list[float]:
+        return [self._plane_eq(self._member.relative_location(self._local_location))]
\ No newline at end of file
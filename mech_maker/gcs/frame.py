@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Generator, TYPE_CHECKING
+import numpy as np
+
+from ..generics import Vec3
+from ..shape import Shape
+from ..curve import Curve
+
+if TYPE_CHECKING:
+    from .mechanism import Mechanism
+
+class FrameLog:
+    """Append only track point samples of one iter_solve run, shared by its frames"""
+    def __init__(self, outputs: int) -> None:
+        self.times: list[float] = []
+        self.locations: list[list[list[float]]] = [[] for _ in range(outputs)]
+        self.velocities: list[list[list[float]]] = [[] for _ in range(outputs)]
+
+    def append(self, time: float, samples: list[tuple[Vec3, Vec3]]) -> None:
+        self.times.append(time)
+        for locations, velocities, (location, velocity) in zip(self.locations, self.velocities, samples):
+            locations.append([float(coord) for coord in location])
+            velocities.append([float(coord) for coord in velocity])
+
+class MechanismFrame:
+    """Record of one solve step, yielded by Mechanism.iter_solve"""
+    def __init__(self, mech: Mechanism, time: float, success: bool, raw_state: list[float], track_points: list[Vec3], log: FrameLog | None) -> None:
+        self._mech = mech
+        self.time = time
+        self.success = success
+        self.raw_state = raw_state
+        self.track_points = track_points
+        self._log = log
+        self._length = 0 if log is None else len(log.times)
+
+    def shapes(self) -> Generator[Shape, None, None]:
+        return self._mech.shapes_at(self.raw_state)
+
+    def curves(self) -> Generator[Curve, None, None]:
+        """Track point curves over the steps of this run solved up to and including this frame"""
+        if self._log is None:
+            raise ValueError('frame curves need iter_solve(times, history=True)')
+
+        times = np.array(self._log.times[:self._length], dtype=float)
+        order = np.argsort(times, kind='stable')
+        return (Curve.from_arrays(np.array(locations[:self._length]).reshape(-1, 3)[order], np.array(velocities[:self._length]).reshape(-1, 3)[order], times[order])
+                for locations, velocities in zip(self._log.locations, self._log.velocities))
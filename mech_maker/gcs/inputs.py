@@ -1,20 +1,69 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Type
+from typing import Iterable, Type
+import numpy as np
 
-from ..generics import MultiD
+from ..generics import MultiD, Quaternion
 from .member import Member
 from .constraint import StandardConstraint, FixedConstraint, RelativeConstraint
+from .arrays import quat_interp
+
+def _interp_arrays(start: MultiD, end: MultiD, ratios: np.ndarray) -> np.ndarray:
+    start_vals = np.array([float(coord) for coord in start])
+    end_vals = np.array([float(coord) for coord in end])
+    if isinstance(start, Quaternion):
+        return quat_interp(start_vals, end_vals, ratios)
+
+    return start_vals * (1 - ratios)[:, None] + end_vals * ratios[:, None]
 
 class MechanismInputParams:
     def __init__(self, start_params: tuple[MultiD, MultiD], end_params: tuple[MultiD, MultiD]) -> None:
         self._start_params = start_params
         self._end_params = end_params
-        
+
+    @property
+    def start_params(self) -> tuple[MultiD, MultiD]:
+        return self._start_params
+
+    @property
+    def end_params(self) -> tuple[MultiD, MultiD]:
+        return self._end_params
+
     def params(self, ratio: float) -> tuple[MultiD, MultiD]:
         return (self._start_params[0].interp(self._end_params[0], ratio), self._start_params[1].interp(self._end_params[1], ratio))
 
+    def param_arrays(self, ratios: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """params for every ratio at once, as (T, D) arrays"""
+        return (_interp_arrays(self._start_params[0], self._end_params[0], ratios), _interp_arrays(self._start_params[1], self._end_params[1], ratios))
+
+class InputSchedule:
+    """The params of one input interpolated for an array of times at once, other times on demand"""
+    def __init__(self, input: MechanismInput, times: Iterable[float]) -> None:
+        self._input = input
+        self._times = np.unique(np.asarray(list(times), dtype=float))
+        self._types = [(type(param.start_params[0]), type(param.start_params[1])) for param in input.params()]
+        self._values = self._interp(self._times)
+
+    def _interp(self, times: np.ndarray) -> list[tuple[np.ndarray, np.ndarray]]:
+        start, end = self._input.time_region
+        ratios = (times - start) / (end - start)
+        return [param.param_arrays(ratios) for param in self._input.params()]
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times
+
+    def params_at(self, time: float) -> tuple[tuple[MultiD, MultiD], ...]:
+        index = int(np.searchsorted(self._times, time))
+        if index < len(self._times) and self._times[index] == time:
+            values = self._values
+        else:
+            values = self._interp(np.array([time], dtype=float))
+            index = 0
+
+        return tuple((type1(*first[index].tolist()), type2(*second[index].tolist())) for (type1, type2), (first, second) in zip(self._types, values))
+
 class MechanismInput(ABC):
     @abstractmethod
     def __init__(self, constraint_type: Type[StandardConstraint], members: tuple[Member] | tuple[Member, Member], time_region: tuple[float, float], *params: MechanismInputParams) -> None:
@@ -22,17 +71,54 @@ class MechanismInput(ABC):
         self._members = members
         self._time_region = time_region
         self._params = params
+        self._schedule = InputSchedule(self, [])
+        self._driver: StandardConstraint | None = None
+
+    @property
+    def constraint_type(self) -> Type[StandardConstraint]:
+        return self._constraint_type
+
+    @property
+    def time_region(self) -> tuple[float, float]:
+        return self._time_region
+
+    def members(self) -> tuple[Member] | tuple[Member, Member]:
+        return self._members
+
+    def params(self) -> tuple[MechanismInputParams, ...]:
+        return self._params
+
+    def _active(self, time: float) -> bool:
+        return self._time_region[0] <= time <= self._time_region[1]
 
     def constraint(self, time: float) -> StandardConstraint | None:
-        if time < self._time_region[0] or time > self._time_region[1]:
+        if not self._active(time):
             return None
 
         return self._constraint_type(*self._members, *[param.params((time - self._time_region[0]) / (self._time_region[1] - self._time_region[0])) for param in self._params])
 
+    def compile(self, times: Iterable[float]) -> InputSchedule:
+        """Interpolate the params for all of times up front, for driver"""
+        self._schedule = InputSchedule(self, times)
+        return self._schedule
+
+    def driver(self, time: float) -> StandardConstraint | None:
+        """Like constraint, but every call retargets and returns the same object, so hold it only until the next call"""
+        if not self._active(time):
+            return None
+
+        params = self._schedule.params_at(time)
+        if self._driver is None:
+            self._driver = self._constraint_type(*self._members, *params)
+        else:
+            self._driver.retarget(*params)
+
+        return self._driver
+
 class FixedMechanismInput(MechanismInput):
     def __init__(self, constraint_type: Type[FixedConstraint], member: Member, region: tuple[float, float], *params: tuple[tuple[MultiD, MultiD], tuple[MultiD, MultiD]]) -> None:
         super().__init__(constraint_type, (member,), region, *params)
 
 class RelativeMechanismInput(MechanismInput):
     def __init__(self, constraint_type: Type[RelativeConstraint], member1: Member, member2: Member, region: tuple[float, float], *params: tuple[tuple[MultiD, MultiD], tuple[MultiD, MultiD]]) -> None:
-        super().__init__(constraint_type, (member1, member2), region, *params)
\ No newline at end of file
+        super().__init__(constraint_type, (member1, member2), region, *params)
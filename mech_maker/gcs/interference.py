@@ -0,0 +1,132 @@
+"""Interference checking of member polylines over a solved trajectory"""
+
+from __future__ import annotations
+
+from typing import Iterable
+import numpy as np
+
+from .mechanism import Mechanism
+
+_EPS = 1e-12
+_TOUCH = 1e-9
+
+def segment_distances(p1: np.ndarray, q1: np.ndarray, p2: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    """Closest distances between segments p1-q1 and p2-q2, broadcast over leading axes"""
+    # Ericson's clamped closest points, Real-Time Collision Detection 5.1.9
+    d1 = q1 - p1
+    d2 = q2 - p2
+    r = p1 - p2
+    a = np.sum(d1 * d1, axis=-1)
+    e = np.sum(d2 * d2, axis=-1)
+    f = np.sum(d2 * r, axis=-1)
+    c = np.sum(d1 * r, axis=-1)
+    b = np.sum(d1 * d2, axis=-1)
+    denom = a * e - b * b
+
+    safe_a = np.where(a > _EPS, a, 1.0)
+    safe_e = np.where(e > _EPS, e, 1.0)
+    s = np.where(denom > _EPS, np.clip((b * f - c * e) / np.where(denom > _EPS, denom, 1.0), 0.0, 1.0), 0.0)
+    t = (b * s + f) / safe_e
+    s = np.where(t < 0.0, np.clip(-c / safe_a, 0.0, 1.0), np.where(t > 1.0, np.clip((b - c) / safe_a, 0.0, 1.0), s))
+    t = np.clip(t, 0.0, 1.0)
+
+    # degenerate segments
+    s = np.where(a <= _EPS, 0.0, np.where(e <= _EPS, np.clip(-c / safe_a, 0.0, 1.0), s))
+    t = np.where(e <= _EPS, 0.0, np.where(a <= _EPS, np.clip(f / safe_e, 0.0, 1.0), t))
+
+    closest1 = p1 + d1 * s[..., None]
+    closest2 = p2 + d2 * t[..., None]
+    return np.linalg.norm(closest1 - closest2, axis=-1)
+
+def sweep_and_prune(lows: np.ndarray, highs: np.ndarray) -> list[tuple[int, int]]:
+    """Index pairs (i < j) of overlapping boxes, given (N, 3) lower and upper corners"""
+    if not len(lows):
+        return []
+
+    centers = (lows + highs) / 2
+    axis = int(np.argmax(np.var(centers, axis=0)))
+    order = np.argsort(lows[:, axis], kind='stable')
+    pairs = []
+    active: list[int] = []
+    for index in order:
+        active = [other for other in active if highs[other, axis] >= lows[index, axis]]
+        for other in active:
+            if np.all(lows[index] <= highs[other]) and np.all(lows[other] <= highs[index]):
+                pairs.append((min(index, other), max(index, other)))
+        active.append(int(index))
+
+    return sorted(pairs)
+
+class Contact:
+    def __init__(self, time: float, members: tuple[int, int], distance: float) -> None:
+        self.time = time
+        self.members = members
+        self.distance = distance
+
+    def __str__(self) -> str:
+        return 'Contact<time=' + str(self.time) + ',members=' + str(self.members) + ',distance=' + str(self.distance) + '>'
+
+class InterferenceChecker:
+    """Finds member shapes that come within clearance of each other over a solved trajectory"""
+    def __init__(self, mech: Mechanism, clearance: float =0.0, skip_jointed: bool =True, ignore: Iterable[tuple[int, int]] =()) -> None:
+        self._mech = mech
+        self._clearance = clearance
+        self._skip = {(min(pair), max(pair)) for pair in ignore}
+        if skip_jointed:
+            for links in [constraint.members() for constraint in mech.constraints()] + [input.members() for input in mech.inputs()]:
+                indices = [mech.member_id(member) for member in links]
+                self._skip.update((min(i, j), max(i, j)) for i in indices for j in indices if i != j)
+
+    def _segments(self, offsets: list[int]) -> list[tuple[np.ndarray, np.ndarray]]:
+        # start and end vertex indices of each member's polyline, a lone vertex is a point segment
+        segments = []
+        for start, end in zip(offsets, offsets[1:]):
+            if end - start == 1:
+                segments.append((np.array([start]), np.array([start])))
+            else:
+                segments.append((np.arange(start, end - 1), np.arange(start + 1, end)))
+
+        return segments
+
+    def contacts(self) -> list[Contact]:
+        """First contact of every interfering member pair, ordered by time"""
+        times = self._mech.trajectory().times()
+        if not len(times):
+            return []
+
+        vertices = self._mech.vertex_history()
+        offsets = self._mech.vertex_offsets()
+        members = [index for index, (start, end) in enumerate(zip(offsets, offsets[1:])) if end > start]
+        if len(members) < 2:
+            return []
+
+        starts = [offsets[index] for index in members]
+        # boxes of planar members are flat, so they get the same slack as the distance test
+        margin = self._clearance / 2 + _TOUCH
+        lows = np.minimum.reduceat(vertices, starts, axis=1) - margin
+        highs = np.maximum.reduceat(vertices, starts, axis=1) + margin
+
+        segments = self._segments(offsets)
+        found = []
+        for slot1, slot2 in sweep_and_prune(lows.min(axis=0), highs.max(axis=0)):
+            index1, index2 = members[slot1], members[slot2]
+            if (index1, index2) in self._skip:
+                continue
+
+            overlapping = np.nonzero(np.all(lows[:, slot1] <= highs[:, slot2], axis=1) & np.all(lows[:, slot2] <= highs[:, slot1], axis=1))[0]
+            if not len(overlapping):
+                continue
+
+            (begin1, end1), (begin2, end2) = segments[index1], segments[index2]
+            frames = vertices[overlapping]
+            dists = segment_distances(frames[:, begin1, None], frames[:, end1, None], frames[:, None, begin2], frames[:, None, end2])
+            closest = dists.reshape(len(overlapping), -1).min(axis=1)
+            hits = np.nonzero(closest <= self._clearance + _TOUCH)[0]
+            if len(hits):
+                found.append(Contact(float(times[overlapping[hits[0]]]), (index1, index2), float(closest[hits[0]])))
+
+        return sorted(found, key=lambda contact: (contact.time, contact.members))
+
+    def first_contact(self) -> Contact | None:
+        found = self.contacts()
+        return found[0] if len(found) else None
@@ -0,0 +1,127 @@
+"""State rates of solved mechanisms from J_x dx/dt = -dC/dt, where only inputs depend on time"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable
+import numpy as np
+
+from ..generics import Vec3
+from .constraint import Constraint
+from .inputs import MechanismInput
+from .state import MechanismState
+
+def residual_vector(constraints: list[Constraint]) -> np.ndarray:
+    res = []
+    for constraint in constraints:
+        res.extend(constraint.residuals())
+
+    return np.array(res, dtype=float)
+
+def color_members(count: int, incidences: Iterable[Iterable[int]]) -> list[list[int]]:
+    """Greedy coloring of member indices so that no two members of a group appear in the same incidence"""
+    neighbours: list[set[int]] = [set() for _ in range(count)]
+    for incidence in incidences:
+        indices = list(incidence)
+        for index in indices:
+            neighbours[index].update(other for other in indices if other != index)
+
+    colors: list[int] = []
+    groups: list[list[int]] = []
+    for index in range(count):
+        taken = {colors[other] for other in neighbours[index] if other < index}
+        color = 0
+        while color in taken:
+            color = color + 1
+        colors.append(color)
+        if color == len(groups):
+            groups.append([])
+        groups[color].append(index)
+
+    return groups
+
+def member_groups(state: MechanismState, constraints: list[Constraint]) -> list[list[int]]:
+    """Groups of members that share no constraint, whose Jacobian columns can be differenced together"""
+    index_of = {id(member): index for index, member in enumerate(state.members())}
+    return color_members(len(index_of), ([index_of[id(member)] for member in constraint.members()] for constraint in constraints))
+
+def constraint_jacobian(state: MechanismState, constraints: list[Constraint], raw: list[float], step: float =1e-6) -> np.ndarray:
+    regions = state.member_regions()
+    index_of = {id(member): index for index, member in enumerate(state.members())}
+    member_rows: list[list[int]] = [[] for _ in regions]
+    row = 0
+    for constraint in constraints:
+        count = len(constraint.residuals())
+        for member in constraint.members():
+            member_rows[index_of[id(member)]].extend(range(row, row + count))
+        row = row + count
+
+    jac = np.zeros((row, len(raw)))
+    base = np.array(raw, dtype=float)
+    for group in member_groups(state, constraints):
+        width = max(regions[index][2] - regions[index][0] for index in group)
+        for offset in range(width):
+            columns = [(index, regions[index][0] + offset) for index in group if regions[index][0] + offset < regions[index][2]]
+            x = base.copy()
+            for _, column in columns:
+                x[column] = base[column] + step
+            state.update_from_raw_values(x)
+            forward = residual_vector(constraints)
+            for _, column in columns:
+                x[column] = base[column] - step
+            state.update_from_raw_values(x)
+            backward = residual_vector(constraints)
+            diff = (forward - backward) / (2 * step)
+            for index, column in columns:
+                rows = member_rows[index]
+                jac[rows, column] = diff[rows]
+
+    state.update_from_raw_values(raw)
+    return jac
+
+def _input_rate(input: MechanismInput, time: float, step: float) -> np.ndarray:
+    # the driver is retargeted by every call, so residuals are read straight away
+    current = np.array(input.driver(time).residuals())
+    forward = input.driver(time + step)
+    forward = None if forward is None else np.array(forward.residuals())
+    backward = input.driver(time - step)
+    backward = None if backward is None else np.array(backward.residuals())
+    input.driver(time)
+    if forward is not None and backward is not None:
+        return (forward - backward) / (2 * step)
+    elif forward is not None:
+        return (forward - current) / step
+    elif backward is not None:
+        return (current - backward) / step
+
+    return np.zeros(len(current))
+
+def state_rate(state: MechanismState, constraints: list[Constraint], inputs: list[MechanismInput], time: float, step: float =1e-6) -> np.ndarray:
+    raw = state.to_raw_values()
+    driven = []
+    for input in inputs:
+        constraint = input.driver(time)
+        if constraint is not None:
+            driven.append((input, constraint))
+
+    all_constraints = list(constraints) + [constraint for _, constraint in driven]
+    jac = constraint_jacobian(state, all_constraints, raw, step)
+
+    time_rates = [np.zeros(len(constraint.residuals())) for constraint in constraints]
+    time_rates.extend(_input_rate(input, time, step) for input, _ in driven)
+    rhs = -np.concatenate(time_rates) if len(time_rates) else np.zeros(0)
+
+    # finite difference noise leaves the gauge singular values near 1e-10
+    # rather than zero, so they have to be cut off explicitly
+    rate, _, _, _ = np.linalg.lstsq(jac, rhs, rcond=1e-8)
+    return rate
+
+def directional_rates(state: MechanismState, raw: list[float], rate: list[float], funcs: list[Callable[[], Vec3]], step: float =1e-6) -> list[Vec3]:
+    """Time derivative of each func along the state rate, by a central difference"""
+    x = np.array(raw, dtype=float)
+    dx = np.array(rate, dtype=float) * step
+    state.update_from_raw_values(x + dx)
+    forward = [func() for func in funcs]
+    state.update_from_raw_values(x - dx)
+    backward = [func() for func in funcs]
+    state.update_from_raw_values(raw)
+    return [(fwd - bwd) / (2 * step) for fwd, bwd in zip(forward, backward)]
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Callable, Generator
+from typing import Callable, Generator, Iterable, Iterator, Sized
+
+import numpy as np
 
 from ..generics import Vec3
 from ..shape import Shape
 from ..curve import Curve
 
 from .state import MechanismState
+from .frame import FrameLog, MechanismFrame
 from .member import Member
-from .constraint import Constraint, OnPlaneConstraint, FixedAxisAlignedConstraint
+from .constraint import Constraint, OnPlaneConstraint, FixedAxisAlignedConstraint, PlaneEquation
 from .inputs import MechanismInput
 from .outputs import MechanismOutput, TrackPoint
-from .solver import Solver
+from .solver import Solver, ScipyLeastSquaresSolver
+from .trajectory import Trajectory
+from .kinematics import state_rate, directional_rates
+from .mobility import DOFReport, analyze_dof
+from .warmstart import WarmStartProvider, mechanism_parameters
 
 class Mechanism:
     def __init__(self, solver: Solver) -> None:
@@ -20,78 +26,381 @@ class Mechanism:
         self._state = MechanismState()
         self._time = 0.0
         self._constraints: list[Constraint] = []
-        self._solved_states: defaultdict[float, list[float] | None] = defaultdict(lambda: None)
+        self._trajectory = Trajectory([])
+        self._stale_states: dict[float, tuple[list[float], set[int]]] = {}
         self._inputs: list[MechanismInput] = []
         self._outputs: list[MechanismOutput] = []
+        self._dof_check = False
+        self._fail_fast = False
+        self._drop_redundant = False
+        self._dof_report: DOFReport | None = None
+        self._warm_start: WarmStartProvider | None = None
+        self._parameters: tuple[str, np.ndarray] | None = None
+        self._parameters_known = False
+
+    def _invalidate_solutions(self, members: Iterable[Member]) -> None:
+        """Turn solved states into warm starts that remember the members edited since they were solved"""
+        # member indices rather than ids, so the edits still match after a pickle round trip
+        index_of = {id(member): index for index, member in enumerate(self._state.members())}
+        edited = {index_of[id(member)] for member in members if id(member) in index_of}
+        for edits in self._stale_states.values():
+            edits[1].update(edited)
+        for time, raw in zip(self._trajectory.times(), self._trajectory.states()):
+            self._stale_states[float(time)] = (raw.tolist(), set(edited))
 
-    def _reset_solutions(self) -> None:
-        self._solved_states = defaultdict(lambda: None)
+        self._trajectory = Trajectory([], path=self._trajectory.path)
+        self._dof_report = None
+        self._parameters_known = False
         for output in self._outputs:
-            output.reset()
+            output.mark_stale()
+
+    def discard_stale(self) -> None:
+        """Forget stale solutions, so the next solves start cold"""
+        self._stale_states = {}
+        for output in self._outputs:
+            output.discard_stale()
 
     def add_member(self, member: Member) -> None:
         self._state.add_member(member)
-        self._reset_solutions()
+        self._invalidate_solutions([member])
 
     def add_constraint(self, constraint: Constraint) -> None:
         self._constraints.append(constraint)
-        self._reset_solutions()
+        self._invalidate_solutions(constraint.members())
 
     def add_track_point(self, point: TrackPoint) -> None:
         self._outputs.append(MechanismOutput(point))
-        for time, state in self._solved_states.items():
+        for time, state, rate in zip(self._trajectory.times(), self._trajectory.states(), self._trajectory.rates()):
             self._state.update_from_raw_values(state)
-            self._outputs[-1].apply_time(time)
+            velocity = directional_rates(self._state, state, rate, [point.position])[0]
+            self._outputs[-1].apply_time(float(time), velocity)
 
-        if len(self._solved_states):
-            self._state.update_from_raw_values(self._solved_states[self._time])
+        if self._time in self._trajectory:
+            self._state.update_from_raw_values(self._trajectory.state(self._time))
 
     def add_input(self, input: MechanismInput) -> None:
         self._inputs.append(input)
-        self._reset_solutions()
+        self._invalidate_solutions(input.members())
 
     def set_solver(self, solver: Solver) -> None:
         self._solver = solver
 
+    def set_warm_start(self, provider: WarmStartProvider | None) -> None:
+        """Seed each solve with the provider's prediction when it has a lower constraint error"""
+        self._warm_start = provider
+
+    def parameters(self) -> tuple[str, np.ndarray] | None:
+        """Topology key and float parameter vector, see warmstart.spec_parameters, or None when no spec can describe the mechanism"""
+        if not self._parameters_known:
+            try:
+                self._parameters = mechanism_parameters(self)
+            except TypeError:
+                # e.g. a custom plane function or constraint type
+                self._parameters = None
+            self._parameters_known = True
+
+        return self._parameters
+
+    def set_dof_check(self, fail_fast: bool, drop_redundant: bool =False) -> None:
+        """Analyze degrees of freedom at a quick assembly of the first step of iter_solve/solve_times
+
+        fail_fast fails every step without solving when a free freedom moves a
+        shape or track point. drop_redundant leaves out constraints that add no
+        rank at that one configuration until the next edit. Neither applies
+        when the assembly does not converge.
+        """
+        self._dof_check = fail_fast or drop_redundant
+        self._fail_fast = fail_fast
+        self._drop_redundant = drop_redundant
+        self._dof_report = None
+
+    def compile_inputs(self, times: Iterable[float]) -> None:
+        """Interpolate every input for all of times up front; iter_solve does this itself"""
+        times = list(times)
+        for input in self._inputs:
+            input.compile(times)
+
+    def _watched_points(self, raw: np.ndarray) -> np.ndarray:
+        members = [self._state.index_of(output.track_point.member) for output in self._outputs]
+        local = np.array([[float(coord) for coord in output.track_point.location] for output in self._outputs])
+        return np.concatenate([self._state.world_vertices(raw), self._state.world_points(members, local, raw)])
+
+    def analyze_dof(self, time: float | None =None) -> DOFReport:
+        """Analyze the current state, watching shape vertices and track points for output_mobility"""
+        time = self._time if time is None else time
+        return analyze_dof(self._state, self._constraints, self._input_constraints(time), self._watched_points)
+
+    def _assembled_dof(self, time: float) -> DOFReport:
+        # builder poses are often degenerate (members stacked at the origin),
+        # so steps are assembled cheaply before taking ranks, and a singular
+        # first step, which over counts freedoms, gets a second look nearby
+        raw = self._state.to_raw_values()
+        span = max([input.time_region[1] - input.time_region[0] for input in self._inputs], default=1.0)
+        report = None
+        for probe in [time, time + 1e-2 * span, time - 1e-2 * span]:
+            self._state.update_from_raw_values(raw)
+            ScipyLeastSquaresSolver(options={'max_nfev': 200}).solve(self._state, self._constraints + self._input_constraints(probe))
+            candidate = self.analyze_dof(probe)
+            if report is None or (candidate.assembled and (not report.assembled or candidate.output_mobility < report.output_mobility)):
+                report = candidate
+            if report.assembled and report.is_determined():
+                break
+
+        self._state.update_from_raw_values(raw)
+        return report
+
+    def members(self) -> Generator[Member, None, None]:
+        return self._state.members()
+
+    def member_id(self, member: Member) -> int:
+        return self._state.index_of(member)
+
+    def constraints(self) -> Generator[Constraint, None, None]:
+        return (constraint for constraint in self._constraints)
+
+    def inputs(self) -> Generator[MechanismInput, None, None]:
+        return (input for input in self._inputs)
+
+    def track_points(self) -> Generator[TrackPoint, None, None]:
+        return (output.track_point for output in self._outputs)
+
     def shapes(self) -> Generator[Shape, None, None]:
         return self._state.shapes()
 
-    def curves(self) -> Generator[Curve, None, None]:
-        return (output.curve() for output in self._outputs)
+    def trajectory(self) -> Trajectory:
+        return self._trajectory
+
+    def set_trajectory_path(self, path: str | None) -> None:
+        """Store solved states in the .npy file at path, so trajectory().memmap() exports them without copying"""
+        self._trajectory = self._trajectory.backed_by(path)
+
+    def track_point_history(self) -> np.ndarray:
+        """Track point locations, shaped (T, P, 3), at every solved time of the trajectory"""
+        matrices, locations = self._trajectory.member_transforms()
+        points = []
+        for output in self._outputs:
+            index = self._state.index_of(output.track_point.member)
+            local = np.array([float(coord) for coord in output.track_point.location])
+            points.append(matrices[:, index] @ local + locations[:, index])
+
+        return np.stack(points, axis=1) if len(points) else np.zeros((len(self._trajectory), 0, 3))
+
+    def vertex_offsets(self) -> list[int]:
+        return self._state.vertex_offsets()
+
+    def vertex_history(self) -> np.ndarray:
+        """World space vertices of every member, shaped (T, V, 3), at every solved time; split with vertex_offsets()"""
+        return self._state.transform_vertices(*self._trajectory.member_transforms())
+
+    def shapes_at(self, raw_state: list[float]) -> Generator[Shape, None, None]:
+        return self._state.shapes_at(raw_state)
+
+    def curves(self, include_stale: bool =False) -> Generator[Curve, None, None]:
+        return (output.curve(include_stale) for output in self._outputs)
+
+    def seed_state(self, raw_state: list[float]) -> None:
+        """Use raw_state as the initial guess for the next solve"""
+        if len(raw_state) != len(self._state.to_raw_values()):
+            raise ValueError('raw state does not match the mechanism topology')
+
+        self._state.update_from_raw_values(raw_state)
 
     def set_time(self, time: float) -> bool:
-        if (self._solved_states[time] is None):
+        state = self._trajectory.state(time)
+        if state is None:
             return self._solve_time(time)
         else:
             self._time = time
-            self._state.update_from_raw_values(self._solved_states[time])
+            self._state.update_from_raw_values(state)
             return True
 
+    def _input_constraints(self, time: float) -> list[Constraint]:
+        """Input drivers at time, retargeted in place; a later call with another time changes them"""
+        cons = []
+        for input in self._inputs:
+            con = input.driver(time)
+            if con is not None:
+                cons.append(con)
+
+        return cons
+
+    def _active_constraints(self) -> list[Constraint]:
+        if not self._drop_redundant or self._dof_report is None or not self._dof_report.assembled:
+            return self._constraints
+
+        redundant = self._dof_report.fully_redundant()
+        return [constraint for constraint in self._constraints if not any(constraint is other for other in redundant)]
+
+    def _record_solution(self, time: float, active: list[Constraint]) -> None:
+        self._time = time
+        self._stale_states.pop(time, None)
+        raw = self._state.to_raw_values()
+        rate = state_rate(self._state, active, self._inputs, time)
+        if self._trajectory.width != len(raw):
+            self._trajectory = Trajectory(self._state.member_regions(), path=self._trajectory.path)
+        self._trajectory.insert(time, raw, rate)
+        velocities = directional_rates(self._state, raw, rate, [output.track_point.position for output in self._outputs])
+        for output, velocity in zip(self._outputs, velocities):
+            output.apply_time(time, velocity)
+
+    def _solve_stale(self, time: float, active: list[Constraint]) -> bool:
+        raw, edited = self._stale_states.pop(time)
+        current = self._state.to_raw_values()
+        # members added since are appended, so they keep their current poses
+        self._state.update_from_raw_values(raw + current[len(raw):])
+        stale = self._state.to_raw_values()
+
+        # only members of edited constraints the stale state violates have to move,
+        # 1e-10 matches the default solver tolerance on the squared residuals
+        index_of = {id(member): index for index, member in enumerate(self._state.members())}
+        cons = active + self._input_constraints(time)
+        moved = {id(member) for constraint in cons
+                 if any(index_of.get(id(member)) in edited for member in constraint.members()) and np.dot(constraint.residuals(), constraint.residuals()) > 1e-10
+                 for member in constraint.members()}
+        if not len(moved):
+            return True
+
+        sub_state = MechanismState()
+        for member in self._state.members():
+            if id(member) in moved:
+                sub_state.add_member(member)
+        sub_state.to_raw_values()
+        def constraints_at(t: float) -> list[Constraint]:
+            return [constraint for constraint in active + self._input_constraints(t) if any(id(member) in moved for member in constraint.members())]
+
+        if self._solver.solve_step(sub_state, constraints_at, None, time):
+            return True
+
+        # the edit reaches further than its own constraints, so everything moves
+        self._state.update_from_raw_values(stale)
+        return self._solver.solve_step(self._state, lambda t: active + self._input_constraints(t), None, time)
+
+    def _apply_warm_start(self, time: float, active: list[Constraint]) -> bool:
+        guess = self._warm_start.predict(self, time)
+        current = self._state.to_raw_values()
+        if guess is None or len(guess) != len(current):
+            return False
+
+        cons = active + self._input_constraints(time)
+        current_error = sum([constraint.eval() for constraint in cons])
+        self._state.update_from_raw_values(guess)
+        if sum([constraint.eval() for constraint in cons]) < current_error:
+            return True
+
+        self._state.update_from_raw_values(current)
+        return False
+
     def _solve_time(self, time: float) -> bool:
         ret = False
-        if (self._solved_states[time] is not None):
+        if time in self._trajectory:
             ret = True
         else:
-            cons = []
-            cons.extend(self._constraints)
-            for input in self._inputs:
-                con = input.constraint(time)
-                if con is not None:
-                    cons.append(con)
-
-            if (self._solver.solve(self._state, cons)):
-                ret = True
-                self._time = time
-                self._solved_states[time] = self._state.to_raw_values()
+            active = self._active_constraints()
+            start_time = self._time if self._time in self._trajectory else None
+
+            if time in self._stale_states:
+                if self._solve_stale(time, active):
+                    self._record_solution(time, active)
+                    return True
+
                 for output in self._outputs:
-                    output.apply_time(time)
+                    output.discard_time(time)
+                if start_time is not None:
+                    self._state.update_from_raw_values(self._trajectory.state(start_time))
+
+            predicted = self._warm_start is not None and self._apply_warm_start(time, active)
+            before = self._solver.iterations
+            if (self._solver.solve_step(self._state, lambda t: active + self._input_constraints(t), None if predicted else start_time, time)):
+                ret = True
+                self._record_solution(time, active)
+
+            if self._warm_start is not None:
+                self._warm_start.record(predicted, self._solver.iterations - before)
 
         return ret
-        
+
+    def solve_times_multires(self, times: list[float], coarse_stride: int =8, tolerance: float =1e-8) -> list[bool]:
+        """Solve a sorted time grid coarse to fine, seeding each level from its solved neighbours"""
+        res = [False] * len(times)
+        if not len(times):
+            return res
+
+        self.compile_inputs(times)
+        stride = max(1, coarse_stride)
+        coarse = list(range(0, len(times), stride))
+        if coarse[-1] != len(times) - 1:
+            coarse.append(len(times) - 1)
+
+        for index in coarse:
+            res[index] = self._solve_time(times[index])
+
+        # bisect between neighbouring visited times, so any stride reaches every index
+        active = self._active_constraints()
+        visited = coarse
+        while True:
+            gaps = [(low, high) for low, high in zip(visited, visited[1:]) if high - low > 1]
+            if not len(gaps):
+                break
+
+            for low, high in gaps:
+                index = (low + high) // 2
+                # a stale solution is a better start than any interpolation
+                if res[low] and res[high] and times[high] != times[low] and times[index] not in self._stale_states:
+                    ratio = (times[index] - times[low]) / (times[high] - times[low])
+                    seed = self._state.interp_raw_values(self._trajectory.state(times[low]), self._trajectory.state(times[high]), ratio)
+                    self._state.update_from_raw_values(seed)
+                    constraints_at = lambda t: active + self._input_constraints(t)
+                    # only an absolute tolerance, so seeding never compounds its neighbours' error
+                    if sum([constraint.eval() for constraint in constraints_at(times[index])]) <= tolerance or \
+                            self._solver.solve_step(self._state, constraints_at, None, times[index]):
+                        self._record_solution(times[index], active)
+                        res[index] = True
+                        continue
+
+                if res[low]:
+                    self._state.update_from_raw_values(self._trajectory.state(times[low]))
+
+                self._time = times[low]
+                res[index] = self._solve_time(times[index])
+
+            visited = sorted(visited + [(low + high) // 2 for low, high in gaps])
+
+        for index in reversed(range(len(times))):
+            if res[index]:
+                self.set_time(times[index])
+                break
+
+        return res
+
+    def iter_solve(self, times: Iterable[float], history: bool =False) -> Iterator[MechanismFrame]:
+        """Solve times lazily, one frame each; history keeps the samples behind MechanismFrame.curves"""
+        log = FrameLog(len(self._outputs)) if history else None
+        # sized times are compiled up front, a stream one step at a time
+        sized = isinstance(times, Sized)
+        if sized:
+            self.compile_inputs(times)
+        for time in times:
+            if not sized:
+                self.compile_inputs([time])
+            if self._dof_check and self._dof_report is None:
+                self._dof_report = self._assembled_dof(time)
+
+            if self._fail_fast and self._dof_report.assembled and not self._dof_report.is_determined():
+                yield MechanismFrame(self, time, False, self._state.to_raw_values(), [output.track_point.position() for output in self._outputs], log)
+                continue
+
+            solved = self.set_time(time)
+            raw_state = self._trajectory.state(time).tolist() if solved else self._state.to_raw_values()
+            positions = [output.track_point.position() for output in self._outputs]
+            if solved and log is not None:
+                log.append(time, [output.sample(time) for output in self._outputs])
+
+            yield MechanismFrame(self, time, solved, raw_state, positions, log)
+
     def solve_times(self, times: list[float], callback: Callable[[bool, Generator[Shape, None, None], Generator[Curve, None, None]], None] | None) -> list[bool]:
         res = []
-        for time in times:
-            res.append(self._solve_time(time))
+        for frame in self.iter_solve(times):
+            res.append(frame.success)
             if callback is not None:
                 callback(res[-1], self.shapes(), self.curves())
 
@@ -102,7 +411,11 @@ class Mechanism2D(Mechanism):
         self._z = z
         super().__init__(solver)
 
+    @property
+    def z(self) -> float:
+        return self._z
+
     def add_member(self, member: Member):
-        self.add_constraint(OnPlaneConstraint(member, Vec3(0,0,0), lambda vec : vec.z - self._z))
+        self.add_constraint(OnPlaneConstraint(member, Vec3(0,0,0), PlaneEquation(Vec3(0,0,1), self._z)))
         self.add_constraint(FixedAxisAlignedConstraint(member, (Vec3(0,0,1), Vec3(0,0,1))))
         super().add_member(member)
@@ -1,21 +1,68 @@
+import numpy as np
+
 from ..generics import Quaternion, Vec3
 from ..shape import Shape
 
+def _rotation_matrix(q: Quaternion) -> tuple[float, ...]:
+    # general form of p -> q p q*, so it matches Vec3.rotate for unnormalized q too
+    w, x, y, z = q
+    ww, xx, yy, zz = w * w, x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+    return (ww + xx - yy - zz, 2 * (xy - wz), 2 * (xz + wy),
+            2 * (xy + wz), ww - xx + yy - zz, 2 * (yz - wx),
+            2 * (xz - wy), 2 * (yz + wx), ww - xx - yy + zz)
+
 class Member:
     def __init__(self, location: Vec3, orientation: Quaternion, shape: Shape) -> None:
         self.location = location
         self.orientation = orientation
         self._shape = shape
 
+    @property
+    def orientation(self) -> Quaternion:
+        return self._orientation
+
+    @orientation.setter
+    def orientation(self, orientation: Quaternion) -> None:
+        self._orientation = orientation
+        self._matrix_key: tuple[float, ...] | None = None
+        self._matrix: tuple[float, ...] = ()
+
+    def _rotation(self) -> tuple[float, ...]:
+        # keyed on the quaternion's values, so in-place edits through
+        # __setitem__ or the w/x/y/z setters also rebuild the matrix
+        key = tuple(self._orientation)
+        if key != self._matrix_key:
+            self._matrix = _rotation_matrix(self._orientation)
+            self._matrix_key = key
+
+        return self._matrix
+
     def relative_location(self, location: Vec3) -> Vec3:
-        p = location.rotate(self.orientation)
-        return p + self.location
+        m = self._rotation()
+        px, py, pz = location
+        tx, ty, tz = self.location
+        return Vec3(m[0] * px + m[1] * py + m[2] * pz + tx,
+                    m[3] * px + m[4] * py + m[5] * pz + ty,
+                    m[6] * px + m[7] * py + m[8] * pz + tz)
 
     def relative_axis(self, axis: Vec3) -> Vec3:
-        return axis.rotate(self.orientation)
+        m = self._rotation()
+        px, py, pz = axis
+        return Vec3(m[0] * px + m[1] * py + m[2] * pz,
+                    m[3] * px + m[4] * py + m[5] * pz,
+                    m[6] * px + m[7] * py + m[8] * pz)
 
     def relative_orientation(self, orientation: Quaternion) -> Quaternion:
         return self.orientation.quat_mult(orientation, True)
 
+    @property
+    def base_shape(self) -> Shape:
+        return self._shape
+
+    def rotation_matrix(self) -> np.ndarray:
+        return np.array(self._rotation()).reshape(3, 3)
+
     def shape(self) -> Shape:
-        return self._shape.transform(self.relative_location)
\ No newline at end of file
+        return self._shape.transformed(self.rotation_matrix(), np.array([float(coord) for coord in self.location]))
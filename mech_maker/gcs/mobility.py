@@ -0,0 +1,99 @@
+"""Degrees of freedom and redundant constraints from the rank of the constraint Jacobian"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from typing import Callable
+
+from .constraint import Constraint
+from .kinematics import constraint_jacobian
+from .member import Member
+from .state import MechanismState
+
+MEMBER_DOF = 6
+
+def _rank(mat: np.ndarray, tol: float) -> int:
+    if mat.size == 0:
+        return 0
+
+    return int(np.sum(np.linalg.svd(mat, compute_uv=False) > tol))
+
+class DOFReport:
+    def __init__(self, nominal_mobility: int, mobility: int, driven_mobility: int, output_mobility: int, redundant: list[tuple[Constraint, int]], free_members: list[tuple[Member, int]], assembled: bool) -> None:
+        self.nominal_mobility = nominal_mobility
+        self.mobility = mobility
+        self.driven_mobility = driven_mobility
+        self.output_mobility = output_mobility
+        self.redundant = redundant
+        self.free_members = free_members
+        self.assembled = assembled
+
+    def fully_redundant(self) -> list[Constraint]:
+        return [constraint for constraint, count in self.redundant if count == constraint.dof()]
+
+    def is_determined(self) -> bool:
+        """Whether no free freedom moves a watched point; idle spins of a link about its own axis do not count"""
+        return self.output_mobility == 0
+
+    def __str__(self) -> str:
+        return ('DOFReport<nominal=' + str(self.nominal_mobility) + ',actual=' + str(self.mobility) + ',driven=' + str(self.driven_mobility)
+                + ',output=' + str(self.output_mobility) + ',redundant=' + str(len(self.redundant)) + ',free_members=' + str(len(self.free_members))
+                + ',assembled=' + str(self.assembled) + '>')
+
+def analyze_dof(state: MechanismState, constraints: list[Constraint], input_constraints: list[Constraint], points: Callable[[np.ndarray], np.ndarray] | None =None, tol: float =1e-6) -> DOFReport:
+    """Analyze the assembled current state; points maps a raw state to the (P, 3) watched points, all freedoms count without it"""
+    raw = state.to_raw_values()
+    regions = state.member_regions()
+    members = list(state.members())
+    free_dof = MEMBER_DOF * len(members)
+
+    all_constraints = list(constraints) + list(input_constraints)
+    jac = constraint_jacobian(state, all_constraints, raw)
+    scale = max(1.0, float(np.abs(jac).max())) if jac.size else 1.0
+    tol = tol * scale
+
+    row_counts = [len(constraint.residuals()) for constraint in all_constraints]
+    num_rows = sum(row_counts[:len(constraints)])
+
+    nominal_mobility = free_dof - sum([constraint.dof() for constraint in constraints])
+    mobility = free_dof - _rank(jac[:num_rows], tol)
+
+    # walk the constraints in order, whatever adds no rank is redundant
+    redundant = []
+    rank = 0
+    row = 0
+    for constraint, count in zip(all_constraints, row_counts):
+        new_rank = _rank(jac[:row + count], tol)
+        missing = constraint.dof() - (new_rank - rank)
+        if missing > 0:
+            redundant.append((constraint, missing))
+        rank = new_rank
+        row = row + count
+
+    driven_mobility = free_dof - rank
+    output_mobility = driven_mobility
+    residuals = np.concatenate([np.array(constraint.residuals(), dtype=float) for constraint in all_constraints]) if len(all_constraints) else np.zeros(0)
+    assembled = not len(residuals) or float(np.abs(residuals).max()) <= 1e-6
+
+    free_members = []
+    if driven_mobility > 0:
+        _, sing, vt = np.linalg.svd(jac) if jac.size else (None, np.zeros(0), np.eye(len(raw)))
+        null = vt[int(np.sum(sing > tol)):]
+        if points is not None:
+            # first order motion of the watched points along each free direction
+            base = np.array(raw, dtype=float)
+            step = 1e-6
+            motion = np.stack([((points(base + step * direction) - points(base - step * direction)) / (2 * step)).ravel() for direction in null], axis=1)
+            output_mobility = _rank(motion, 1e-6 * max(1.0, float(np.abs(motion).max()) if motion.size else 1.0))
+        for member, region in zip(members, regions):
+            block = null[:, region[0]:region[2]].copy()
+            # drop the quaternion scale direction, it is not a real freedom
+            quat = np.array(raw[region[1]:region[2]])
+            quat_cols = slice(region[1] - region[0], region[2] - region[0])
+            block[:, quat_cols] = block[:, quat_cols] - np.outer(block[:, quat_cols] @ quat, quat)
+            member_free = _rank(block, 1e-6)
+            if member_free > 0:
+                free_members.append((member, member_free))
+
+    return DOFReport(nominal_mobility, mobility, driven_mobility, output_mobility, redundant, free_members, assembled)
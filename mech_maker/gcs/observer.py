@@ -0,0 +1,67 @@
+"""Throttled recording of solver iterates into a ring buffer of raw vectors"""
+
+from __future__ import annotations
+
+import time as timer
+from typing import Callable, Generator
+import numpy as np
+
+from ..shape import Shape
+from .state import MechanismState
+
+class IterationObserver:
+    """Keeps the latest capacity iterates that pass the every / interval throttle"""
+    def __init__(self, every: int =1, interval: float | None =None, capacity: int =256, callback: Callable[[np.ndarray], None] | None =None) -> None:
+        self._every = max(1, every)
+        self._interval = interval
+        self._capacity = capacity
+        self._callback = callback
+        self._buffer: np.ndarray | None = None
+        self._next = 0
+        self._last_record = -np.inf
+        self.seen = 0
+        self.recorded = 0
+
+    def __call__(self, raw: np.ndarray) -> None:
+        self.seen = self.seen + 1
+        if self.seen % self._every:
+            return
+
+        if self._interval is not None:
+            now = timer.perf_counter()
+            if now - self._last_record < self._interval:
+                return
+            self._last_record = now
+
+        raw = np.asarray(raw, dtype=float)
+        if self._buffer is None or self._buffer.shape[1] != len(raw):
+            # a different mechanism starts a new recording
+            self._buffer = np.empty((self._capacity, len(raw)))
+            self._next = 0
+            self.recorded = 0
+
+        self._buffer[self._next] = raw
+        self._next = (self._next + 1) % self._capacity
+        self.recorded = self.recorded + 1
+        if self._callback is not None:
+            self._callback(self._buffer[self._next - 1])
+
+    def iterates(self) -> np.ndarray:
+        """Recorded raw iterates, oldest first"""
+        if self._buffer is None:
+            return np.zeros((0, 0))
+        elif self.recorded < self._capacity:
+            return self._buffer[:self.recorded].copy()
+
+        return np.concatenate([self._buffer[self._next:], self._buffer[:self._next]])
+
+    def shapes(self, state: MechanismState) -> Generator[list[Shape], None, None]:
+        """Member shapes of each recorded iterate"""
+        return (list(state.shapes_at(raw)) for raw in self.iterates())
+
+    def clear(self) -> None:
+        self._buffer = None
+        self._next = 0
+        self._last_record = -np.inf
+        self.seen = 0
+        self.recorded = 0
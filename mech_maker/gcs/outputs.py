@@ -1,5 +1,9 @@
+from __future__ import annotations
+
+import numpy as np
+
 from ..generics import Vec3
-from ..curve import CurvePoint, Curve
+from ..curve import Curve
 
 from .member import Member
 
@@ -8,68 +12,73 @@ class TrackPoint():
         self._member = member
         self._location = location
 
+    @property
+    def member(self) -> Member:
+        return self._member
+
+    @property
+    def location(self) -> Vec3:
+        return self._location
+
     def position(self) -> Vec3:
         return self._member.relative_location(self._location)
 
 class MechanismOutput:
     def __init__(self, track_point: TrackPoint) -> None:
         self._track_point = track_point
-        self._points: list[tuple[float, Vec3]] = []
-
-    def _update_neightbor_velocities(index: int) -> None:
-        pass
-
-    def _velocity_at(self, index: int, first_last_diff: float) -> Vec3:
-        if index == 0:
-            if len(self._points) != 1: # forward difference
-                if first_last_diff > 0.01:
-                    return (self._points[0][1] - self._points[1][1]) / (self._points[0][0] - self._points[1][0])
-                else: # cyclic
-                    t0 = self._points[1][0]
-                    t1 = self._points[0][0]
-                    t2 = self._points[0][0] + (self._points[-2][0] - self._points[-1][0])
-                    p0 = self._points[1][1]
-                    p1 = self._points[0][1]
-                    p2 = self._points[-2][1]
-            else:
-                return Vec3(0,0,0)
-        elif index == len(self._points) - 1:
-            if first_last_diff > 0.01: # backward difference
-                return (self._points[-2][1] - self._points[-1][1]) / (self._points[-2][0] - self._points[-1][0])
-            else: # cylic
-                t0 = self._points[-1][0] + (self._points[1][0] - self._points[0][0])
-                t1 = self._points[-1][0]
-                t2 = self._points[-2][0]
-                p0 = self._points[1][1]
-                p1 = self._points[-1][1]
-                p2 = self._points[-2][1]
-        else:
-            t0 = self._points[index + 1][0]
-            t1 = self._points[index][0]
-            t2 = self._points[index - 1][0]
-            p0 = self._points[index + 1][1]
-            p1 = self._points[index][1]
-            p2 = self._points[index - 1][1]
-                        
-        # parabolic interpolation
-        p0 = ((t1 - t2) / ((t0 - t1) * (t0 - t2))) * p0
-        p1 = (((t1 - t2) + (t1 - t0)) / ((t1 - t2) * (t1 - t0))) * p1
-        p2 = ((t1 - t0) / ((t2 - t0) * (t2 - t1))) * p2
-        return p0 + p1 + p2
-
-    def apply_time(self, time: float) -> None:
+        self._points: list[tuple[float, Vec3, Vec3]] = []
+        self._samples: dict[float, tuple[Vec3, Vec3]] = {}
+        self._stale: set[float] = set()
+
+    @property
+    def track_point(self) -> TrackPoint:
+        return self._track_point
+
+    def apply_time(self, time: float, velocity: Vec3) -> None:
         index = 0
         for point in self._points:
-            if point[0] < time:
+            if point[0] <= time:
                 break
 
             index = index + 1
 
-        self._points.insert(index, (time, self._track_point.position()))
+        if index < len(self._points) and self._points[index][0] == time:
+            self._points[index] = (time, self._track_point.position(), velocity)
+        else:
+            self._points.insert(index, (time, self._track_point.position(), velocity))
+
+        self._samples[time] = self._points[index][1:]
+        self._stale.discard(time)
+
+    def sample(self, time: float) -> tuple[Vec3, Vec3] | None:
+        """Location and velocity recorded at time"""
+        return self._samples.get(time)
+
+    def mark_stale(self) -> None:
+        """Keep the current points until their times are solved again, but leave them out of curve()"""
+        self._stale = {point[0] for point in self._points}
+
+    def stale_times(self) -> set[float]:
+        return set(self._stale)
+
+    def discard_time(self, time: float) -> None:
+        self._points = [point for point in self._points if point[0] != time]
+        self._samples.pop(time, None)
+        self._stale.discard(time)
+
+    def discard_stale(self) -> None:
+        self._points = [point for point in self._points if point[0] not in self._stale]
+        for time in self._stale:
+            self._samples.pop(time, None)
+        self._stale = set()
 
     def reset(self) -> None:
         self._points = []
+        self._samples = {}
+        self._stale = set()
 
-    def curve(self) -> Curve:
-        first_last_diff = (self._points[0][1] - self._points[-1][1]).magnitude()
-        return Curve([CurvePoint(point[1], self._velocity_at(index, first_last_diff)) for index, point in reversed(list(enumerate(self._points)))])
+    def curve(self, include_stale: bool =False) -> Curve:
+        points = [point for point in reversed(self._points) if include_stale or point[0] not in self._stale]
+        return Curve.from_arrays(np.array([[float(coord) for coord in point[1]] for point in points]),
+                                 np.array([[float(coord) for coord in point[2]] for point in points]),
+                                 np.array([point[0] for point in points], dtype=float))
@@ -1,27 +1,52 @@
 from __future__ import annotations
 
+import time as timer
 from abc import ABC, abstractmethod
 from typing import Callable, Iterable
-from scipy import optimize as opt
+import numpy as np
 
 from ..shape import Shape
 
 from .state import MechanismState
 from .constraint import Constraint
+from .observer import IterationObserver
 
 class Solver(ABC):
     """Abstract Base Class for Various Constraint Solving Methods"""
+    # running total over every solve, callers diff it around a solve
+    iterations = 0
+
     @abstractmethod
     def solve(self, state: MechanismState, constraints: list[Constraint]) -> bool:
         pass
 
-class ScipySLSQPSolver(Solver):
-    """Constraint Solver using scipy's SLSQP implementation"""
-    def __init__(self, iter_callback: Callable[[Iterable[Shape]], None] | None =None) -> None:
-        self._iter_callback: Callable[[list[float]], None] | None = None if iter_callback is None else lambda x: iter_callback(self._state.shapes())
+    def solve_step(self, state: MechanismState, constraints_at: Callable[[float], list[Constraint]], start_time: float | None, time: float) -> bool:
+        """Solve for time, starting from the state solved at start_time (None if there is none)"""
+        return self.solve(state, constraints_at(time))
+
+class ScipyMinimizeSolver(Solver):
+    """Constraint Solver minimizing the summed constraint error with scipy.optimize.minimize"""
+    def __init__(self, method: str, iter_callback: Callable[[Iterable[Shape]], None] | None =None, options: dict | None =None, observer: IterationObserver | None =None) -> None:
+        self._method = method
+        self._options = options
+        if observer is None and iter_callback is not None:
+            # the original per iteration shape callback, unthrottled
+            observer = IterationObserver(capacity=1, callback=lambda raw: iter_callback(self._state.shapes_at(raw)))
+        self._observer = observer
         self._state: MechanismState | None = None
         self._constraints: list[Constraint] | None = None
 
+    @property
+    def method(self) -> str:
+        return self._method
+
+    @property
+    def observer(self) -> IterationObserver | None:
+        return self._observer
+
+    def set_observer(self, observer: IterationObserver | None) -> None:
+        self._observer = observer
+
     def _op_func(self, inp: list[float]) -> float:
         self._state.update_from_raw_values(inp)
         return sum([constraint.eval() for constraint in self._constraints])
@@ -29,5 +54,180 @@ class ScipySLSQPSolver(Solver):
     def solve(self, state: MechanismState, constraints: list[Constraint]) -> bool:
         self._state = state
         self._constraints = constraints
-        res = opt.minimize(self._op_func, state.to_raw_values(), method='SLSQP', jac='2-point', callback=self._iter_callback)
+        from scipy import optimize as opt # deferred, importing scipy.optimize is slow
+        jac = '2-point' if self._method in ('SLSQP', 'BFGS', 'L-BFGS-B', 'CG', 'TNC', 'trust-constr') else None
+        res = opt.minimize(self._op_func, state.to_raw_values(), method=self._method, jac=jac, callback=self._observer, options=self._options)
+        # the last objective call may have been a gradient probe
+        state.update_from_raw_values(res.x)
+        self.iterations = self.iterations + int(getattr(res, 'nit', res.nfev))
         return res.success
+
+class ScipySLSQPSolver(ScipyMinimizeSolver):
+    """Constraint Solver using scipy's SLSQP implementation"""
+    def __init__(self, iter_callback: Callable[[Iterable[Shape]], None] | None =None, options: dict | None =None, observer: IterationObserver | None =None) -> None:
+        super().__init__('SLSQP', iter_callback, options, observer)
+
+class SolveStrategy(ABC):
+    """One way of attempting a solve step within a PortfolioSolver; budget caps its attempts for the portfolio's whole life and never resets"""
+    def __init__(self, name: str, budget: int | None) -> None:
+        self.name = name
+        self.budget = budget
+
+    @abstractmethod
+    def attempt(self, state: MechanismState, constraints_at: Callable[[float], list[Constraint]], start_time: float | None, time: float) -> bool:
+        pass
+
+    def solvers(self) -> list[Solver]:
+        solver = getattr(self, '_solver', None)
+        return [] if solver is None else [solver]
+
+class DirectStrategy(SolveStrategy):
+    """Solve straight from the current state"""
+    def __init__(self, solver: Solver, name: str | None =None, budget: int | None =None) -> None:
+        super().__init__(type(solver).__name__ if name is None else name, budget)
+        self._solver = solver
+
+    def attempt(self, state: MechanismState, constraints_at: Callable[[float], list[Constraint]], start_time: float | None, time: float) -> bool:
+        return self._solver.solve(state, constraints_at(time))
+
+class PerturbedRestartStrategy(SolveStrategy):
+    """Retry from randomly perturbed copies of the current state"""
+    def __init__(self, solver: Solver, scale: float =1e-2, tries: int =3, seed: int | None =None, name: str ='perturbed_restart', budget: int | None =None) -> None:
+        super().__init__(name, budget)
+        self._solver = solver
+        self._scale = scale
+        self._tries = tries
+        self._rng = np.random.default_rng(seed)
+
+    def attempt(self, state: MechanismState, constraints_at: Callable[[float], list[Constraint]], start_time: float | None, time: float) -> bool:
+        raw = np.array(state.to_raw_values())
+        constraints = constraints_at(time)
+        for _ in range(self._tries):
+            state.update_from_raw_values(raw + self._rng.normal(0.0, self._scale, raw.shape))
+            if self._solver.solve(state, constraints):
+                return True
+
+        return False
+
+class SubstepStrategy(SolveStrategy):
+    """March from the previously solved time to the target in smaller steps"""
+    def __init__(self, solver: Solver, divisions: int =4, name: str ='substep', budget: int | None =None) -> None:
+        super().__init__(name, budget)
+        self._solver = solver
+        self._divisions = divisions
+
+    def attempt(self, state: MechanismState, constraints_at: Callable[[float], list[Constraint]], start_time: float | None, time: float) -> bool:
+        if start_time is None or start_time == time:
+            return False
+
+        for step in range(1, self._divisions + 1):
+            sub_time = start_time + (time - start_time) * (step / self._divisions)
+            if not self._solver.solve(state, constraints_at(sub_time)):
+                return False
+
+        return True
+
+class StrategyStats:
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.successes = 0
+        self.seconds = 0.0
+
+    def __str__(self) -> str:
+        return 'StrategyStats<attempts=' + str(self.attempts) + ',successes=' + str(self.successes) + ',seconds=' + str(round(self.seconds, 3)) + '>'
+
+class PortfolioSolver(Solver):
+    """Tries a chain of strategies in order until one succeeds, restoring the state if all fail"""
+    def __init__(self, *strategies: SolveStrategy) -> None:
+        names = [strategy.name for strategy in strategies]
+        for name in names:
+            if names.count(name) > 1:
+                raise ValueError('Duplicate strategy name ' + name + ', pass a distinct name to each strategy')
+
+        self._strategies = strategies
+        self._stats = {strategy.name: StrategyStats() for strategy in strategies}
+
+    @staticmethod
+    def default() -> PortfolioSolver:
+        slsqp = ScipySLSQPSolver()
+        return PortfolioSolver(
+            DirectStrategy(slsqp),
+            DirectStrategy(ScipyMinimizeSolver('BFGS'), name='BFGS'),
+            SubstepStrategy(slsqp),
+            PerturbedRestartStrategy(slsqp),
+        )
+
+    def stats(self) -> dict[str, StrategyStats]:
+        return self._stats
+
+    @property
+    def iterations(self) -> int:
+        # strategies often share one solver, which must only be counted once
+        solvers = {id(solver): solver for strategy in self._strategies for solver in strategy.solvers()}
+        return sum(solver.iterations for solver in solvers.values())
+
+    def solve(self, state: MechanismState, constraints: list[Constraint]) -> bool:
+        return self.solve_step(state, lambda time: constraints, None, 0.0)
+
+    def solve_step(self, state: MechanismState, constraints_at: Callable[[float], list[Constraint]], start_time: float | None, time: float) -> bool:
+        raw = state.to_raw_values()
+        for strategy in self._strategies:
+            stats = self._stats[strategy.name]
+            if strategy.budget is not None and stats.attempts >= strategy.budget:
+                continue
+
+            state.update_from_raw_values(raw)
+            stats.attempts = stats.attempts + 1
+            start = timer.perf_counter()
+            solved = strategy.attempt(state, constraints_at, start_time, time)
+            stats.seconds = stats.seconds + (timer.perf_counter() - start)
+            if solved:
+                stats.successes = stats.successes + 1
+                return True
+
+        state.update_from_raw_values(raw)
+        return False
+
+def jacobian_sparsity(state: MechanismState, constraints: list[Constraint]):
+    """Boolean residual x raw value pattern, built from the members each constraint touches"""
+    from scipy.sparse import lil_matrix # deferred, importing scipy.sparse is slow
+
+    regions = state.member_regions()
+    columns = {id(member): region for member, region in zip(state.members(), regions)}
+    row_counts = [len(constraint.residuals()) for constraint in constraints]
+    pattern = lil_matrix((sum(row_counts), regions[-1][2] if len(regions) else 0), dtype=bool)
+    row = 0
+    for constraint, count in zip(constraints, row_counts):
+        # members outside the state are held fixed and have no columns
+        for region in [columns[id(member)] for member in constraint.members() if id(member) in columns]:
+            pattern[row:row + count, region[0]:region[2]] = True
+        row = row + count
+
+    return pattern
+
+class ScipyLeastSquaresSolver(Solver):
+    """Constraint Solver using scipy's sparse trust region least squares on the residual vectors"""
+    def __init__(self, tolerance: float =1e-10, options: dict | None =None) -> None:
+        self._tolerance = tolerance
+        self._options = {} if options is None else options
+        self._state: MechanismState | None = None
+        self._constraints: list[Constraint] | None = None
+
+    def _res_func(self, inp: np.ndarray) -> np.ndarray:
+        self._state.update_from_raw_values(inp)
+        res = []
+        for constraint in self._constraints:
+            res.extend(constraint.residuals())
+
+        return np.array(res)
+
+    def solve(self, state: MechanismState, constraints: list[Constraint]) -> bool:
+        self._state = state
+        self._constraints = constraints
+        from scipy import optimize as opt # deferred, importing scipy.optimize is slow
+        x0 = np.array(state.to_raw_values())
+        res = opt.least_squares(self._res_func, x0, jac='2-point', jac_sparsity=jacobian_sparsity(state, constraints), method='trf', tr_solver='lsmr', **self._options)
+        state.update_from_raw_values(res.x)
+        # trf evaluates the residuals once per iteration
+        self.iterations = self.iterations + int(res.nfev)
+        return bool(res.success) and 2 * res.cost <= self._tolerance
@@ -0,0 +1,172 @@
+"""JSON compatible mechanism specs, with members referenced by index"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Type
+
+from ..generics import MultiD, Quaternion, Vec3
+from ..shape import Shape
+
+from . import constraint as cons
+from .constraint import Constraint, OnPlaneConstraint, PlaneEquation, StandardConstraint
+from .inputs import MechanismInput, MechanismInputParams, FixedMechanismInput, RelativeMechanismInput
+from .mechanism import Mechanism, Mechanism2D
+from .member import Member
+from .outputs import TrackPoint
+from .solver import Solver
+
+SPEC_VERSION = 1
+
+_CONSTRAINT_TYPES: dict[str, Type[StandardConstraint]] = {constraint_type.__name__: constraint_type for constraint_type in [
+    cons.RelativeLocationConstraint,
+    cons.RelativeOrientationConstraint,
+    cons.RelativeAxisAlignedConstraint,
+    cons.RelativePinConstraint,
+    cons.FixedLocationConstraint,
+    cons.FixedOrientationConstraint,
+    cons.FixedAxisAlignedConstraint,
+    cons.FixedPinConstraint,
+    cons.FixedAllConstraint,
+]}
+
+_INPUT_TYPES: dict[str, Type[MechanismInput]] = {input_type.__name__: input_type for input_type in [
+    FixedMechanismInput,
+    RelativeMechanismInput,
+]}
+
+_MECHANISM_TYPES: dict[str, Type[Mechanism]] = {mechanism_type.__name__: mechanism_type for mechanism_type in [
+    Mechanism,
+    Mechanism2D,
+]}
+
+def _dump_multid(value: MultiD) -> list[float]:
+    return [float(coord) for coord in value]
+
+def _load_multid(coords: list[float]) -> MultiD:
+    if len(coords) == 3:
+        return Vec3(*coords)
+    elif len(coords) == 4:
+        return Quaternion(*coords)
+
+    raise ValueError('expected 3 (Vec3) or 4 (Quaternion) coordinates, got ' + str(len(coords)))
+
+def _dump_pair(pair: tuple[MultiD, MultiD]) -> list[list[float]]:
+    return [_dump_multid(pair[0]), _dump_multid(pair[1])]
+
+def _load_pair(pair: list[list[float]]) -> tuple[MultiD, MultiD]:
+    return (_load_multid(pair[0]), _load_multid(pair[1]))
+
+def _dump_member(member: Member) -> dict[str, Any]:
+    return {
+        'location': _dump_multid(member.location),
+        'orientation': _dump_multid(member.orientation),
+        'shape': [_dump_multid(point) for point in member.base_shape.points()],
+    }
+
+def _load_member(spec: dict[str, Any]) -> Member:
+    shape = Shape([Vec3(*point) for point in spec['shape']])
+    return Member(Vec3(*spec['location']), Quaternion(*spec['orientation']), shape)
+
+def _dump_constraint(mech: Mechanism, constraint: Constraint) -> dict[str, Any]:
+    name = type(constraint).__name__
+    if isinstance(constraint, OnPlaneConstraint):
+        plane = constraint.plane_eq
+        if not isinstance(plane, PlaneEquation):
+            raise TypeError('only PlaneEquation planes can be serialized, got ' + type(plane).__name__)
+
+        return {
+            'type': name,
+            'members': [mech.member_id(member) for member in constraint.members()],
+            'local_location': _dump_multid(constraint.local_location),
+            'plane': {'normal': _dump_multid(plane.normal), 'offset': float(plane.offset)},
+        }
+    elif name in _CONSTRAINT_TYPES and type(constraint) is _CONSTRAINT_TYPES[name]:
+        return {
+            'type': name,
+            'members': [mech.member_id(member) for member in constraint.members()],
+            'params': [_dump_pair(pair) for pair in constraint.params()],
+        }
+
+    raise TypeError('constraint type ' + name + ' cannot be serialized')
+
+def _load_constraint(members: list[Member], spec: dict[str, Any]) -> Constraint:
+    constraint_members = [members[index] for index in spec['members']]
+    if spec['type'] == OnPlaneConstraint.__name__:
+        plane = PlaneEquation(Vec3(*spec['plane']['normal']), spec['plane']['offset'])
+        return OnPlaneConstraint(constraint_members[0], Vec3(*spec['local_location']), plane)
+
+    constraint_type = _CONSTRAINT_TYPES[spec['type']]
+    return constraint_type(*constraint_members, *[_load_pair(pair) for pair in spec['params']])
+
+def _dump_input(mech: Mechanism, input: MechanismInput) -> dict[str, Any]:
+    name = type(input).__name__
+    if name not in _INPUT_TYPES or type(input) is not _INPUT_TYPES[name]:
+        raise TypeError('input type ' + name + ' cannot be serialized')
+
+    constraint_name = input.constraint_type.__name__
+    if constraint_name not in _CONSTRAINT_TYPES:
+        raise TypeError('input constraint type ' + constraint_name + ' cannot be serialized')
+
+    return {
+        'type': name,
+        'constraint': constraint_name,
+        'members': [mech.member_id(member) for member in input.members()],
+        'region': [float(bound) for bound in input.time_region],
+        'params': [{'start': _dump_pair(param.start_params), 'end': _dump_pair(param.end_params)} for param in input.params()],
+    }
+
+def _load_input(members: list[Member], spec: dict[str, Any]) -> MechanismInput:
+    input_type = _INPUT_TYPES[spec['type']]
+    constraint_type = _CONSTRAINT_TYPES[spec['constraint']]
+    params = [MechanismInputParams(_load_pair(param['start']), _load_pair(param['end'])) for param in spec['params']]
+    return input_type(constraint_type, *[members[index] for index in spec['members']], tuple(spec['region']), *params)
+
+def mechanism_to_spec(mech: Mechanism) -> dict[str, Any]:
+    name = type(mech).__name__
+    if name not in _MECHANISM_TYPES or type(mech) is not _MECHANISM_TYPES[name]:
+        raise TypeError('mechanism type ' + name + ' cannot be serialized')
+
+    spec: dict[str, Any] = {'version': SPEC_VERSION, 'type': name}
+    if isinstance(mech, Mechanism2D):
+        spec['z'] = float(mech.z)
+
+    spec['members'] = [_dump_member(member) for member in mech.members()]
+    spec['constraints'] = [_dump_constraint(mech, constraint) for constraint in mech.constraints()]
+    spec['inputs'] = [_dump_input(mech, input) for input in mech.inputs()]
+    spec['track_points'] = [{'member': mech.member_id(point.member), 'location': _dump_multid(point.location)} for point in mech.track_points()]
+    return spec
+
+def mechanism_from_spec(spec: dict[str, Any], solver: Solver) -> Mechanism:
+    if spec.get('version') != SPEC_VERSION:
+        raise ValueError('unsupported spec version ' + str(spec.get('version')))
+
+    mech_type = _MECHANISM_TYPES[spec['type']]
+    mech = mech_type(solver, spec['z']) if mech_type is Mechanism2D else mech_type(solver)
+
+    members = [_load_member(member_spec) for member_spec in spec['members']]
+    for member in members:
+        # the spec already lists any constraints a subclass adds per member
+        Mechanism.add_member(mech, member)
+
+    for constraint_spec in spec['constraints']:
+        mech.add_constraint(_load_constraint(members, constraint_spec))
+
+    for input_spec in spec['inputs']:
+        mech.add_input(_load_input(members, input_spec))
+
+    for point_spec in spec['track_points']:
+        mech.add_track_point(TrackPoint(members[point_spec['member']], Vec3(*point_spec['location'])))
+
+    return mech
+
+def dumps(mech: Mechanism) -> str:
+    return json.dumps(mechanism_to_spec(mech), sort_keys=True, separators=(',', ':'))
+
+def loads(text: str, solver: Solver) -> Mechanism:
+    return mechanism_from_spec(json.loads(text), solver)
+
+def spec_digest(spec: dict[str, Any]) -> str:
+    canonical = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
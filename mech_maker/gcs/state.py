@@ -1,43 +1,149 @@
+from __future__ import annotations
+
 from typing import Generator
+import numpy as np
 
 from ..generics import Vec3, Quaternion
 from ..shape import Shape
+from .arrays import normalized, rotation_matrices
 from .member import Member
 
 
 class MechanismState:
     def __init__(self) -> None:
         self._members: list[Member] = []
-        self._member_map: dict[int, list[int]] = {}
+        self._member_map: list[list[int]] = []
+        self._vertex_offsets: list[int] | None = None
+        self._vertex_sources: list[np.ndarray] = []
+        self._vertices: np.ndarray | None = None
+        self._vertex_members: np.ndarray | None = None
 
     def add_member(self, member: Member) -> None:
         self._members.append(member)
+        self._vertex_offsets = None
+
+    def members(self) -> Generator[Member, None, None]:
+        return (member for member in self._members)
+
+    def index_of(self, member: Member) -> int:
+        for index, other in enumerate(self._members):
+            if other is member:
+                return index
+
+        raise ValueError('member is not part of this mechanism')
+
+    def _regions(self) -> list[list[int]]:
+        # the layout only depends on the member count, so a map left stale by add_member is rebuilt
+        if len(self._member_map) != len(self._members):
+            self._member_map = [[index * 7, index * 7 + 3, index * 7 + 7] for index in range(len(self._members))]
+
+        return self._member_map
+
+    def member_regions(self) -> list[list[int]]:
+        """Raw value offsets of each member as [location start, orientation start, end]"""
+        return [list(regions) for regions in self._regions()]
 
     def to_raw_values(self) -> list[float]:
         state = []
+        self._member_map = []
         for member in self._members:
-            self._member_map[id(member)] = [len(state)]
+            regions = [len(state)]
             state.extend(member.location)
-            self._member_map[id(member)].append(len(state))
+            regions.append(len(state))
             state.extend(member.orientation) # test
-            self._member_map[id(member)].append(len(state)) # test
+            regions.append(len(state)) # test
             # axis, angle = member.orientation.to_axis_angle()
             # state.extend(axis)
-            # self._member_map[id(member)].append(len(state))
+            # regions.append(len(state))
             # state.append(angle)
-            # self._member_map[id(member)].append(len(state))
+            # regions.append(len(state))
+            self._member_map.append(regions)
 
         return state
 
     def update_from_raw_values(self, vals: list[float]) -> None:
-        for member in self._members:
-            regions = self._member_map[id(member)]
+        member_map = self._regions()
+        if len(vals) != 7 * len(self._members):
+            raise ValueError('expected ' + str(7 * len(self._members)) + ' raw values, got ' + str(len(vals)))
+
+        for member, regions in zip(self._members, member_map):
             member.location = Vec3(*vals[regions[0]:regions[1]])
             member.orientation = Quaternion.build(*vals[regions[1]:regions[2]], True)
             # axis = Vec3(*vals[regions[1]:regions[2]])
             # angle = float(*vals[regions[2]:regions[3]])
             # member.orientation = Quaternion.from_axis_angle(axis, angle)
 
+    def interp_raw_values(self, vals1: list[float], vals2: list[float], ratio: float) -> list[float]:
+        """Blend two raw states, lerping locations and slerping orientations"""
+        state = []
+        for regions in self._regions():
+            location1 = Vec3(*vals1[regions[0]:regions[1]])
+            location2 = Vec3(*vals2[regions[0]:regions[1]])
+            state.extend(location1.interp(location2, ratio))
+            orientation1 = Quaternion(*vals1[regions[1]:regions[2]])
+            orientation2 = Quaternion(*vals2[regions[1]:regions[2]])
+            state.extend(orientation1.slerp(orientation2, ratio))
+
+        return state
+
+    def _vertex_buffer_stale(self) -> bool:
+        # Shape.add_point replaces the vertex array, so identity catches shape edits
+        return self._vertex_offsets is None or len(self._vertex_sources) != len(self._members) or \
+            any(member.base_shape.vertices() is not source for member, source in zip(self._members, self._vertex_sources))
+
+    def _build_vertex_buffer(self) -> None:
+        shapes = [member.base_shape.vertices() for member in self._members]
+        self._vertex_sources = shapes
+        self._vertex_offsets = [0]
+        for vertices in shapes:
+            self._vertex_offsets.append(self._vertex_offsets[-1] + len(vertices))
+
+        self._vertices = np.concatenate(shapes) if len(shapes) else np.zeros((0, 3))
+        self._vertex_members = np.repeat(np.arange(len(shapes)), [len(vertices) for vertices in shapes])
+
+    def vertex_offsets(self) -> list[int]:
+        """Start of each member's vertices in the world_vertices buffer, followed by the total count"""
+        if self._vertex_buffer_stale():
+            self._build_vertex_buffer()
+
+        return list(self._vertex_offsets)
+
+    def _current_transforms(self) -> tuple[np.ndarray, np.ndarray]:
+        rotations = np.array([member.rotation_matrix() for member in self._members]).reshape(len(self._members), 3, 3)
+        locations = np.array([[float(coord) for coord in member.location] for member in self._members]).reshape(len(self._members), 3)
+        return rotations, locations
+
+    def _raw_transforms(self, vals: list[float] | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        vals = np.asarray(vals, dtype=float)
+        rotations = rotation_matrices(normalized(np.array([vals[regions[1]:regions[2]] for regions in self._regions()]).reshape(len(self._members), 4)))
+        locations = np.array([vals[regions[0]:regions[1]] for regions in self._regions()]).reshape(len(self._members), 3)
+        return rotations, locations
+
+    def transform_vertices(self, rotations: np.ndarray, locations: np.ndarray, out: np.ndarray | None =None) -> np.ndarray:
+        """World space vertices, shaped (..., V, 3), of per member rotations (..., M, 3, 3) and locations (..., M, 3)"""
+        if self._vertex_buffer_stale():
+            self._build_vertex_buffer()
+
+        out = np.einsum('...vij,vj->...vi', rotations[..., self._vertex_members, :, :], self._vertices, out=out)
+        out += locations[..., self._vertex_members, :]
+        return out
+
+    def world_vertices(self, vals: list[float] | np.ndarray | None =None, out: np.ndarray | None =None) -> np.ndarray:
+        """World space vertices of the current pose, or of raw state vals, optionally written into out"""
+        rotations, locations = self._current_transforms() if vals is None else self._raw_transforms(vals)
+        return self.transform_vertices(rotations, locations, out)
+
+    def world_points(self, members: list[int], local: np.ndarray, vals: list[float] | np.ndarray | None =None) -> np.ndarray:
+        """World locations of points local to members, shaped (P, 3), at the current pose or raw state vals"""
+        rotations, locations = self._current_transforms() if vals is None else self._raw_transforms(vals)
+        return np.einsum('pij,pj->pi', rotations[members], np.asarray(local, dtype=float).reshape(-1, 3)) + locations[members]
+
+    def _split_shapes(self, vertices: np.ndarray) -> Generator[Shape, None, None]:
+        offsets = self.vertex_offsets()
+        return (Shape(vertices[start:end]) for start, end in zip(offsets, offsets[1:]))
+
     def shapes(self) -> Generator[Shape, None, None]:
-        return (member.shape() for member in self._members)
+        return self._split_shapes(self.world_vertices())
 
+    def shapes_at(self, vals: list[float]) -> Generator[Shape, None, None]:
+        return self._split_shapes(self.world_vertices(vals))
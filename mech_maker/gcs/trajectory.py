@@ -0,0 +1,177 @@
+"""Dense time sorted storage of solved mechanism states"""
+
+from __future__ import annotations
+
+import os
+import numpy as np
+
+from .arrays import normalized, quat_slerp, rotation_matrices
+
+class Trajectory:
+    """Time sorted solved states and rates with a member -> column map"""
+    def __init__(self, regions: list[list[int]], tolerance: float =1e-12, path: str | None =None) -> None:
+        self._regions = [list(region) for region in regions]
+        self._width = regions[-1][2] if len(regions) else 0
+        self._tolerance = tolerance
+        self._path = path
+        self._count = 0
+        self._allocate(0)
+        self._rates = np.zeros((0, self._width))
+
+    def __getstate__(self) -> dict:
+        # a copy must never write into the original's file
+        state = dict(self.__dict__)
+        state['_path'] = None
+        state['_table'] = np.array(self._table)
+        del state['_times'], state['_states']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._times = self._table[:, 0]
+        self._states = self._table[:, 1:]
+
+    def _allocate(self, capacity: int) -> None:
+        # times and states share one (capacity, 1 + D) table, which is the .npy file itself when path is set
+        kept = self._table[:self._count].copy() if self._count else np.zeros((0, self._width + 1))
+        if self._path is None:
+            self._table = np.zeros((capacity, self._width + 1))
+        else:
+            # a fresh file renamed into place leaves maps of the old one readable
+            self._table = np.lib.format.open_memmap(self._path + '.tmp', mode='w+', dtype=np.float64, shape=(capacity, self._width + 1))
+            self._table[self._count:] = np.nan
+            os.replace(self._path + '.tmp', self._path)
+        self._table[:self._count] = kept
+        self._times = self._table[:, 0]
+        self._states = self._table[:, 1:]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, time: float) -> bool:
+        return self.index_of(time) is not None
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    def member_columns(self, index: int) -> tuple[slice, slice]:
+        """Location and orientation columns of the member at index"""
+        region = self._regions[index]
+        return slice(region[0], region[1]), slice(region[1], region[2])
+
+    def times(self) -> np.ndarray:
+        return self._times[:self._count]
+
+    def states(self) -> np.ndarray:
+        return self._states[:self._count]
+
+    def rates(self) -> np.ndarray:
+        return self._rates[:self._count]
+
+    def index_of(self, time: float) -> int | None:
+        times = self.times()
+        index = int(np.searchsorted(times, time))
+        tolerance = self._tolerance * max(1.0, abs(time))
+        for candidate in (index - 1, index):
+            if 0 <= candidate < self._count and abs(times[candidate] - time) <= tolerance:
+                return candidate
+
+        return None
+
+    def insert(self, time: float, state: list[float], rate: list[float]) -> None:
+        index = self.index_of(time)
+        if index is None:
+            if self._count == len(self._times):
+                capacity = max(8, 2 * len(self._times))
+                self._allocate(capacity)
+                self._rates = np.resize(self._rates, (capacity, self._width))
+
+            index = int(np.searchsorted(self.times(), time))
+            self._times[index + 1:self._count + 1] = self._times[index:self._count]
+            self._states[index + 1:self._count + 1] = self._states[index:self._count]
+            self._rates[index + 1:self._count + 1] = self._rates[index:self._count]
+            self._count = self._count + 1
+
+        self._times[index] = time
+        self._states[index] = state
+        self._rates[index] = rate
+
+    def state(self, time: float) -> np.ndarray | None:
+        index = self.index_of(time)
+        return None if index is None else self._states[index]
+
+    def rate(self, time: float) -> np.ndarray | None:
+        index = self.index_of(time)
+        return None if index is None else self._rates[index]
+
+    def nearest(self, time: float) -> tuple[float, np.ndarray]:
+        if not self._count:
+            raise ValueError('the trajectory is empty')
+
+        times = self.times()
+        index = int(np.searchsorted(times, time))
+        if index == self._count or (index > 0 and time - times[index - 1] <= times[index] - time):
+            index = index - 1
+
+        return float(times[index]), self._states[index]
+
+    def interpolate(self, time: float) -> np.ndarray:
+        """State at time, lerping locations and slerping orientations between the bracketing solutions"""
+        if not self._count:
+            raise ValueError('the trajectory is empty')
+
+        times = self.times()
+        high = int(np.searchsorted(times, time))
+        if high == 0 or high == self._count:
+            return self._states[min(high, self._count - 1)].copy()
+
+        low = high - 1
+        ratio = (time - times[low]) / (times[high] - times[low])
+        res = self._states[low] * (1 - ratio) + self._states[high] * ratio
+        for region in self._regions:
+            res[region[1]:region[2]] = quat_slerp(self._states[low, region[1]:region[2]], self._states[high, region[1]:region[2]], ratio)
+
+        return res
+
+    def member_transforms(self) -> tuple[np.ndarray, np.ndarray]:
+        """Rotation matrices, shaped (T, M, 3, 3), and locations, shaped (T, M, 3), of every member at every time"""
+        states = self.states()
+        locations = np.stack([states[:, region[0]:region[1]] for region in self._regions], axis=1) if len(self._regions) else np.zeros((self._count, 0, 3))
+        orientations = np.stack([states[:, region[1]:region[2]] for region in self._regions], axis=1) if len(self._regions) else np.zeros((self._count, 0, 4))
+        return rotation_matrices(normalized(orientations)), locations
+
+    def save_npz(self, path: str) -> None:
+        np.savez(path, times=self.times(), states=self.states(), rates=self.rates(), regions=np.array(self._regions, dtype=np.int64).reshape(len(self._regions), 3))
+
+    @property
+    def path(self) -> str | None:
+        return self._path
+
+    def memmap(self) -> np.memmap:
+        """Solved rows of the backing .npy file, times in column 0, without copying; valid until an insert grows the file"""
+        if self._path is None:
+            raise ValueError('the trajectory is not backed by a file, pass path to Trajectory')
+
+        self._table.flush()
+        return self._table[:self._count]
+
+    def backed_by(self, path: str | None) -> Trajectory:
+        """A copy of this trajectory stored in the .npy file at path, or in memory for None"""
+        trajectory = Trajectory(self._regions, self._tolerance, path)
+        trajectory._count = self._count
+        trajectory._table = self._table
+        trajectory._allocate(max(8, self._count))
+        trajectory._rates = np.resize(self.rates(), (len(trajectory._times), self._width))
+        return trajectory
+
+    @staticmethod
+    def load_npz(path: str) -> Trajectory:
+        with np.load(path) as data:
+            trajectory = Trajectory(data['regions'].tolist())
+            trajectory._table = np.concatenate([data['times'][:, None], data['states']], axis=1)
+            trajectory._count = len(trajectory._table)
+            trajectory._allocate(trajectory._count)
+            trajectory._rates = data['rates'].copy()
+
+        return trajectory
@@ -0,0 +1,158 @@
+"""Learned initial guesses for Mechanism solves from solutions of similar mechanisms"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from typing import Any, TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    from .mechanism import Mechanism
+    from .trajectory import Trajectory
+
+def _strip_floats(spec: Any) -> Any:
+    if isinstance(spec, dict):
+        return {key: _strip_floats(value) for key, value in spec.items()}
+    elif isinstance(spec, list):
+        return [_strip_floats(value) for value in spec]
+    elif isinstance(spec, float):
+        return None
+
+    return spec
+
+def _collect_floats(spec: Any, out: list[float]) -> None:
+    if isinstance(spec, dict):
+        for key in sorted(spec):
+            _collect_floats(spec[key], out)
+    elif isinstance(spec, list):
+        for value in spec:
+            _collect_floats(value, out)
+    elif isinstance(spec, float):
+        out.append(spec)
+
+def spec_parameters(spec: dict[str, Any]) -> tuple[str, np.ndarray]:
+    """Topology key and float parameter vector of a mechanism spec"""
+    canonical = json.dumps(_strip_floats(spec), sort_keys=True, separators=(',', ':'))
+    params: list[float] = []
+    _collect_floats(spec, params)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest(), np.array(params)
+
+def mechanism_parameters(mech: Mechanism) -> tuple[str, np.ndarray]:
+    """spec_parameters without member poses, which are solver state rather than design parameters"""
+    from .spec import mechanism_to_spec
+
+    spec = mechanism_to_spec(mech)
+    spec['members'] = [{'shape': member['shape']} for member in spec['members']]
+    return spec_parameters(spec)
+
+class WarmStartStats:
+    def __init__(self) -> None:
+        self.predictions = 0
+        self.fallbacks = 0
+        self.predicted_iterations = 0
+        self.fallback_iterations = 0
+
+    def iterations_saved(self) -> float:
+        """Estimate from the mean iterations of fallback solves, 0 until there are both kinds"""
+        if not self.predictions or not self.fallbacks:
+            return 0.0
+
+        return self.predictions * (self.fallback_iterations / self.fallbacks) - self.predicted_iterations
+
+    def __str__(self) -> str:
+        return 'WarmStartStats<predictions=' + str(self.predictions) + ',fallbacks=' + str(self.fallbacks) + ',iterations_saved=' + str(round(self.iterations_saved(), 1)) + '>'
+
+class WarmStartProvider(ABC):
+    """Predicts initial raw states for Mechanism solves"""
+    def __init__(self) -> None:
+        self._stats = WarmStartStats()
+
+    def stats(self) -> WarmStartStats:
+        return self._stats
+
+    @abstractmethod
+    def predict(self, mech: Mechanism, time: float) -> list[float] | None:
+        """Predicted raw state, or None when there is no confident prediction"""
+        pass
+
+    def record(self, predicted: bool, iterations: int) -> None:
+        if predicted:
+            self._stats.predictions = self._stats.predictions + 1
+            self._stats.predicted_iterations = self._stats.predicted_iterations + iterations
+        else:
+            self._stats.fallbacks = self._stats.fallbacks + 1
+            self._stats.fallback_iterations = self._stats.fallback_iterations + iterations
+
+class _Samples:
+    def __init__(self) -> None:
+        self.features: list[np.ndarray] = []
+        self.states: list[np.ndarray] = []
+        self.matrix: np.ndarray | None = None
+        self.scale: np.ndarray | None = None
+
+    def build(self) -> None:
+        self.matrix = np.array(self.features)
+        spread = self.matrix.std(axis=0)
+        self.scale = np.where(spread > 1e-12, spread, 1.0)
+
+class KNNWarmStart(WarmStartProvider):
+    """Distance weighted k nearest neighbours over standardized (parameters, time), only when the neighbours agree"""
+    def __init__(self, k: int =3, max_distance: float =1.0, max_spread: float =0.5) -> None:
+        super().__init__()
+        self._k = k
+        self._max_distance = max_distance
+        self._max_spread = max_spread
+        self._samples: dict[str, _Samples] = {}
+
+    def __len__(self) -> int:
+        return sum(len(samples.states) for samples in self._samples.values())
+
+    def add_solution(self, topology: str, params: np.ndarray, time: float, raw_state: list[float] | np.ndarray) -> None:
+        samples = self._samples.setdefault(topology, _Samples())
+        samples.features.append(np.append(np.asarray(params, dtype=float), time))
+        samples.states.append(np.asarray(raw_state, dtype=float))
+        samples.matrix = None
+
+    def add_trajectory(self, topology: str, params: np.ndarray, trajectory: Trajectory) -> None:
+        for time, state in zip(trajectory.times(), trajectory.states()):
+            self.add_solution(topology, params, float(time), state)
+
+    def add_mechanism(self, mech: Mechanism) -> None:
+        """Learn every solved state of mech"""
+        parameters = mech.parameters()
+        if parameters is None:
+            raise TypeError('only mechanisms that can be serialized to a spec can be learned')
+
+        topology, params = parameters
+        self.add_trajectory(topology, params, mech.trajectory())
+
+    def predict(self, mech: Mechanism, time: float) -> list[float] | None:
+        parameters = mech.parameters()
+        if parameters is None:
+            return None
+
+        topology, params = parameters
+        samples = self._samples.get(topology)
+        if samples is None or not len(samples.states):
+            return None
+
+        if samples.matrix is None:
+            samples.build()
+
+        query = np.append(params, time)
+        if len(query) != samples.matrix.shape[1]:
+            return None
+
+        dists = np.linalg.norm((samples.matrix - query) / samples.scale, axis=1)
+        nearest = np.argsort(dists)[:self._k]
+        if dists[nearest[0]] > self._max_distance:
+            return None
+
+        states = np.array([samples.states[index] for index in nearest])
+        if np.max(np.abs(states - states[0])) > self._max_spread:
+            return None
+
+        weights = 1.0 / (dists[nearest] + 1e-9)
+        return (weights @ states / np.sum(weights)).tolist()
@@ -228,6 +228,21 @@ class Quaternion(MultiD):
         axis, angle = diff.to_axis_angle()
         return Quaternion.from_axis_angle(axis, angle * ratio).quat_mult(self, True)
 
+    def slerp(self, other: Quaternion, ratio: float) -> Quaternion:
+        """Spherical interpolation along the shorter arc, robust near identical rotations"""
+        dot = sum([val1 * val2 for (val1, val2) in zip(self, other)])
+        if dot < 0:
+            other = -other
+            dot = -dot
+
+        if dot > 0.9995:
+            return Quaternion(*[val1 + (val2 - val1) * ratio for (val1, val2) in zip(self, other)]).normalized()
+
+        theta = np.arccos(dot)
+        scale1 = np.sin((1 - ratio) * theta) / np.sin(theta)
+        scale2 = np.sin(ratio * theta) / np.sin(theta)
+        return Quaternion(*[(val1 * scale1) + (val2 * scale2) for (val1, val2) in zip(self, other)])
+
     @staticmethod
     def identity() -> Quaternion:
         return Quaternion(1,0,0,0)
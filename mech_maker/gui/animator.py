@@ -1,8 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Iterable
-
-import matplotlib.pyplot as plt
-import matplotlib.animation as anim
+import numpy as np
 
 from ..generics import Vec3, Vec2
 from ..shape import Shape
@@ -31,6 +29,10 @@ class Animator2D(Animator):
 
 class MPEGAnimator(Animator2D):
     def __init__(self, normal: Vec3, outfile: str, fps: int, xlim: tuple[float, float], ylim: tuple[float, float]) -> None:
+        # deferred, matplotlib is slow to import
+        import matplotlib.pyplot as plt
+        import matplotlib.animation as anim
+
         self._xlim = xlim
         self._ylim = ylim
 
@@ -41,41 +43,19 @@ class MPEGAnimator(Animator2D):
         super().__init__(normal)
 
     def write_frame(self, shapes: Iterable[Shape], curves: Iterable[Curve]) -> None:
+        projection = np.array([self._x_axis.np_array(), self._y_axis.np_array()])
         for shape in shapes:
-            x = []
-            y = []
-            for point in shape.points():
-                pt = self._project_to_plane(point)
-                x.append(pt.x)
-                y.append(pt.y)
-            
-            self._axs.plot(x, y)
+            projected = shape.vertices() @ projection.T
+            self._axs.plot(projected[:, 0], projected[:, 1])
 
         for curve in curves:
-            x = []
-            y = []
-            for point in curve.points():
-                pt = self._project_to_plane(point.location)
-                x.append(pt.x)
-                y.append(pt.y)
-
-            self._axs.plot(x, y)
-
-            x = []
-            y = []
-            u = []
-            v = []
-            for point in curve.points():
-                if point.velocity.x != 0 or point.velocity.y != 0:
-                    pt = self._project_to_plane(point.location)
-                    vel = self._project_to_plane(point.velocity)
-                    x.append(pt.x)
-                    y.append(pt.y)
-                    u.append(vel.x)
-                    v.append(vel.y)
-
-            if len(x) > 0:
-                self._axs.quiver(x, y, u, v, width=self._axs.viewLim.width * 0.0005)
+            locations = curve.locations() @ projection.T
+            self._axs.plot(locations[:, 0], locations[:, 1])
+
+            velocities = curve.velocities() @ projection.T
+            moving = (curve.velocities()[:, 0] != 0) | (curve.velocities()[:, 1] != 0)
+            if np.any(moving):
+                self._axs.quiver(locations[moving, 0], locations[moving, 1], velocities[moving, 0], velocities[moving, 1], width=self._axs.viewLim.width * 0.0005)
 
         x = []
         y = []
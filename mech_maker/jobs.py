@@ -0,0 +1,26 @@
+"""Self contained solve jobs that can run in worker processes"""
+
+from __future__ import annotations
+
+from typing import Any
+
+def solve_spec(spec: dict[str, Any], times: list[float], num_samples: int | None) -> dict[str, Any]:
+    # heavy imports stay inside the job so that importing this module is cheap
+    from .gcs.solver import ScipySLSQPSolver
+    from .gcs.spec import mechanism_from_spec
+
+    mech = mechanism_from_spec(spec, ScipySLSQPSolver())
+    frames = []
+    for frame in mech.iter_solve(times):
+        frames.append({
+            'time': frame.time,
+            'success': frame.success,
+            'track_points': [[float(coord) for coord in point] for point in frame.track_points],
+        })
+
+    features = []
+    if num_samples is not None and any(frame['success'] for frame in frames):
+        from .analyzer.features import CurveFeature
+        features = [[float(val) for val in CurveFeature(curve, num_samples).features] for curve in mech.curves()]
+
+    return {'frames': frames, 'features': features}
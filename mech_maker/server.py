@@ -0,0 +1,232 @@
+"""Asyncio job server streaming batch mechanism solves as newline delimited JSON"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+from .jobs import solve_spec
+
+def _job_key(spec: dict[str, Any], times: list[float], num_samples: int | None) -> str:
+    canonical = json.dumps({'mechanism': spec, 'times': times, 'num_samples': num_samples}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class _Job:
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.status = 'queued'
+        self.subscribers = 0
+        self.task: asyncio.Task | None = None
+        self.future: Future | None = None
+
+class JobServer:
+    """Deduplicating, concurrency limited front end for a process pool"""
+    def __init__(self, workers: int | None =None, max_concurrent: int =4, max_queued: int =64, cache_size: int =128) -> None:
+        # forked workers would inherit open client sockets and hold them open
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self._max_concurrent = max_concurrent
+        self._max_queued = max_queued
+        self._cache_size = cache_size
+        self._slots: asyncio.Semaphore | None = None
+        self._jobs: dict[str, _Job] = {}
+        self._results: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    async def _run(self, job: _Job, spec: dict[str, Any], times: list[float], num_samples: int | None) -> dict[str, Any]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_concurrent)
+
+        try:
+            async with self._slots:
+                job.status = 'running'
+                job.future = self._pool.submit(solve_spec, spec, times, num_samples)
+                pending = asyncio.wrap_future(job.future)
+                try:
+                    result = await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    # a worker cannot be interrupted, so the slot stays taken until it is free again
+                    job.future.cancel()
+                    await asyncio.wait([pending])
+                    raise
+        finally:
+            # a cancelled job may finish after an identical request started a new one
+            if self._jobs.get(job.key) is job:
+                self._jobs.pop(job.key)
+
+        self._results[job.key] = result
+        while len(self._results) > self._cache_size:
+            self._results.popitem(last=False)
+
+        return result
+
+    def submit(self, spec: dict[str, Any], times: list[float], num_samples: int | None) -> tuple[str, _Job | dict[str, Any]]:
+        key = _job_key(spec, times, num_samples)
+        if key in self._results:
+            self._results.move_to_end(key)
+            return key, self._results[key]
+
+        job = self._jobs.get(key)
+        if job is None:
+            if sum(other.status == 'queued' for other in self._jobs.values()) >= self._max_queued:
+                raise OverflowError('job queue is full')
+
+            job = _Job(key)
+            job.task = asyncio.ensure_future(self._run(job, spec, times, num_samples))
+            self._jobs[key] = job
+
+        return key, job
+
+    def cancel(self, key: str) -> bool:
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return False
+
+        job.status = 'cancelled'
+        job.task.cancel()
+        return True
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+    def status(self) -> list[dict[str, Any]]:
+        return [{'job': job.key, 'status': job.status, 'subscribers': job.subscribers} for job in self._jobs.values()]
+
+    async def _write_event(self, writer: asyncio.StreamWriter, event: dict[str, Any]) -> None:
+        writer.write((json.dumps(event) + '\n').encode('utf-8'))
+        await writer.drain()
+
+    async def _stream_result(self, writer: asyncio.StreamWriter, key: str, result: dict[str, Any]) -> None:
+        for frame in result['frames']:
+            await self._write_event(writer, dict(event='frame', **frame))
+
+        if result['features']:
+            await self._write_event(writer, {'event': 'features', 'features': result['features']})
+
+        await self._write_event(writer, {'event': 'done', 'job': key})
+
+    async def _handle_solve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, body: dict[str, Any]) -> None:
+        try:
+            key, submitted = self.submit(body['mechanism'], [float(time) for time in body['times']], body.get('num_samples'))
+        except OverflowError as err:
+            await self._respond(writer, 503, {'error': str(err)})
+            return
+        except (KeyError, TypeError, ValueError) as err:
+            await self._respond(writer, 400, {'error': repr(err)})
+            return
+
+        self._start_stream(writer)
+        if not isinstance(submitted, _Job):
+            await self._write_event(writer, {'event': 'cached', 'job': key})
+            await self._stream_result(writer, key, submitted)
+            return
+
+        job = submitted
+        job.subscribers = job.subscribers + 1
+        await self._write_event(writer, {'event': 'accepted', 'job': job.key})
+
+        hangup = asyncio.ensure_future(self._wait_for_reset(reader))
+        try:
+            await asyncio.wait([job.task, hangup], return_when=asyncio.FIRST_COMPLETED)
+            if not job.task.done():
+                job.subscribers = job.subscribers - 1
+                if job.subscribers == 0:
+                    self.cancel(job.key)
+                return
+
+            if job.task.cancelled():
+                await self._write_event(writer, {'event': 'cancelled', 'job': job.key})
+            elif job.task.exception() is not None:
+                await self._write_event(writer, {'event': 'error', 'job': job.key, 'error': repr(job.task.exception())})
+            else:
+                await self._stream_result(writer, job.key, job.task.result())
+        finally:
+            hangup.cancel()
+
+    async def _wait_for_reset(self, reader: asyncio.StreamReader) -> None:
+        # EOF only means the client is done sending (it may have half closed), so just a reset counts as hanging up
+        try:
+            while await reader.read(65536):
+                pass
+        except ConnectionError:
+            return
+
+        await asyncio.Event().wait()
+
+    def _start_stream(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n')
+
+    async def _respond(self, writer: asyncio.StreamWriter, code: int, payload: Any) -> None:
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 503: 'Service Unavailable'}
+        body = json.dumps(payload).encode('utf-8')
+        head = 'HTTP/1.1 ' + str(code) + ' ' + reasons[code] + '\r\nContent-Type: application/json\r\nContent-Length: ' + str(len(body)) + '\r\nConnection: close\r\n\r\n'
+        writer.write(head.encode('utf-8') + body)
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            if len(request_line) < 2:
+                await self._respond(writer, 400, {'error': 'malformed request line'})
+                return
+
+            method, path = request_line[0], request_line[1]
+            body = await reader.readexactly(int(headers.get('content-length', '0')))
+
+            if method == 'POST' and path == '/solve':
+                try:
+                    payload = json.loads(body)
+                except ValueError as err:
+                    await self._respond(writer, 400, {'error': repr(err)})
+                    return
+                await self._handle_solve(reader, writer, payload)
+            elif method == 'GET' and path == '/jobs':
+                await self._respond(writer, 200, self.status())
+            elif method == 'DELETE' and path.startswith('/jobs/'):
+                cancelled = self.cancel(path[len('/jobs/'):])
+                await self._respond(writer, 200 if cancelled else 404, {'cancelled': cancelled})
+            else:
+                await self._respond(writer, 404, {'error': 'unknown route ' + method + ' ' + path})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str ='127.0.0.1', port: int | None =8490, unix_path: str | None =None) -> None:
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+def main(argv: list[str] | None =None) -> None:
+    parser = argparse.ArgumentParser(description='serve batch mechanism solves')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8490)
+    parser.add_argument('--unix', default=None, help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-concurrent', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    server = JobServer(args.workers, args.max_concurrent)
+    asyncio.run(server.serve(args.host, args.port, args.unix))
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,37 @@
 from __future__ import annotations
 
-from typing import Generator, Callable
+from typing import Generator, Callable, Iterable
+import numpy as np
+
 from .generics import Vec3
 
 class Shape:
-    def __init__(self, points: list[Vec3]) -> None:
-        self._points = points
+    """Polyline whose vertices are stored as an (N, 3) array"""
+    def __init__(self, points: Iterable[Vec3] | np.ndarray) -> None:
+        if isinstance(points, np.ndarray):
+            self._vertices = np.asarray(points, dtype=float).reshape(-1, 3)
+        else:
+            self._vertices = np.array([[float(coord) for coord in point] for point in points], dtype=float).reshape(-1, 3)
+
+    def __len__(self) -> int:
+        return len(self._vertices)
 
     def add_point(self, point: Vec3) -> None:
-        self._points.append(point)
+        self._vertices = np.vstack([self._vertices, [float(coord) for coord in point]])
+
+    def vertices(self) -> np.ndarray:
+        return self._vertices
 
     def points(self) -> Generator[Vec3, None, None]:
-        return (point for point in self._points)
+        return (Vec3(*vertex) for vertex in self._vertices.tolist())
 
     def transform(self, callback: Callable[[Vec3], Vec3]) -> Shape:
-        return Shape([callback(point) for point in self._points])
+        return Shape([callback(point) for point in self.points()])
+
+    def transformed(self, rotation: np.ndarray, translation: np.ndarray) -> Shape:
+        """Shape rotated by a 3x3 matrix, then translated"""
+        return Shape(self._vertices @ np.asarray(rotation).T + translation)
 
 class Line(Shape):
     def __init__(self, len: float) -> None:
-        super().__init__([Vec3(0,0,0), Vec3(len,0,0)])
\ No newline at end of file
+        super().__init__([Vec3(0,0,0), Vec3(len,0,0)])
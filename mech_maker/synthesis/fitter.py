@@ -0,0 +1,129 @@
+"""Dimensional synthesis: fit builder parameters so a track point traces a target curve"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable
+import numpy as np
+
+from ..curve import Curve
+from ..gcs.interference import InterferenceChecker
+from ..gcs.mechanism import Mechanism
+
+FAILED_COST = 1e6
+
+def resampled_distance(candidate: np.ndarray, target: np.ndarray, cyclic: bool) -> float:
+    """Mean squared distance between equally sampled curves, over every start phase and direction of closed ones"""
+    if not cyclic:
+        return float(np.mean(np.sum((candidate - target) ** 2, axis=1)))
+
+    ring = candidate[:-1]
+    target_ring = target[:-1]
+    n = len(ring)
+    index = (np.arange(n)[:, None] + np.arange(n)[None, :]) % n
+    shifted = np.concatenate([ring[index], ring[::-1][index]])
+    dists = np.mean(np.sum((shifted - target_ring[None, :, :]) ** 2, axis=2), axis=1)
+    return float(dists.min())
+
+def _evaluate(builder: Callable[[np.ndarray], Mechanism], params: np.ndarray, times: list[float], track_index: int, target: np.ndarray, cyclic: bool, warm: list[list[float]] | None, clearance: float | None =None) -> tuple[float, list[list[float]] | None]:
+    try:
+        mech = builder(params)
+    except (ValueError, ArithmeticError):
+        return FAILED_COST, None
+
+    # frames are solved lazily, so each step can be seeded just before it runs
+    frames = mech.iter_solve(times)
+    states = []
+    for index in range(len(times)):
+        if warm is not None:
+            try:
+                mech.seed_state(warm[index])
+            except ValueError:
+                warm = None
+
+        try:
+            frame = next(frames)
+        except (ValueError, ArithmeticError):
+            return FAILED_COST, None
+
+        if not frame.success:
+            return FAILED_COST, None
+
+        states.append(frame.raw_state)
+
+    if clearance is not None and InterferenceChecker(mech, clearance).first_contact() is not None:
+        return FAILED_COST, None
+
+    curves = list(mech.curves())
+    if track_index >= len(curves):
+        raise ValueError('builder produced ' + str(len(curves)) + ' track points, need index ' + str(track_index))
+
+    candidate = curves[track_index].resampled(len(target)).locations()
+    return resampled_distance(candidate, target, cyclic), states
+
+def _evaluate_packed(args: tuple) -> tuple[float, list[list[float]] | None]:
+    return _evaluate(*args)
+
+class FitResult:
+    def __init__(self, params: np.ndarray, cost: float, evaluations: int, success: bool, message: str) -> None:
+        self.params = params
+        self.cost = cost
+        self.evaluations = evaluations
+        self.success = success
+        self.message = message
+
+class CurveFitter:
+    """Fits builder parameters so that a track point traces a target curve"""
+    def __init__(self, builder: Callable[[np.ndarray], Mechanism], bounds: list[tuple[float, float]], target: Curve, times: list[float], num_samples: int =50, track_index: int =0, workers: int =1, clearance: float | None =None) -> None:
+        self._builder = builder
+        self._bounds = bounds
+        self._times = times
+        self._track_index = track_index
+        self._workers = workers
+        self._clearance = clearance
+        self._cyclic = target.is_closed()
+        self._target = target.resampled(num_samples).locations()
+        self._pool: ProcessPoolExecutor | None = None
+        self._best_cost = np.inf
+        self._best_states: list[list[float]] | None = None
+        self.evaluations = 0
+
+    def _record(self, cost: float, states: list[list[float]] | None) -> float:
+        self.evaluations = self.evaluations + 1
+        if states is not None and cost < self._best_cost:
+            self._best_cost = cost
+            self._best_states = states
+
+        return cost
+
+    def __call__(self, params: np.ndarray) -> float:
+        cost, states = _evaluate(self._builder, params, self._times, self._track_index, self._target, self._cyclic, self._best_states, self._clearance)
+        return self._record(cost, states)
+
+    def _map(self, func: Callable, population: Iterable[np.ndarray]) -> list[float]:
+        # differential_evolution hands over its own wrapper of self, the
+        # population is evaluated directly so warm states can come back too
+        warm = self._best_states
+        jobs = [(self._builder, params, self._times, self._track_index, self._target, self._cyclic, warm, self._clearance) for params in population]
+        return [self._record(cost, states) for cost, states in self._pool.map(_evaluate_packed, jobs)]
+
+    def fit(self, maxiter: int =100, popsize: int =15, tol: float =1e-6, seed: int | None =None, polish: bool =True, x0: np.ndarray | None =None) -> FitResult:
+        from scipy.optimize import differential_evolution
+
+        workers: int | Callable = 1
+        if self._workers > 1:
+            # spawned workers import the builder, so it has to be a module level function
+            self._pool = ProcessPoolExecutor(max_workers=self._workers, mp_context=multiprocessing.get_context('spawn'))
+            workers = self._map
+
+        # x0 only exists from scipy 1.7 on, requirements still pin 1.6
+        options = {} if x0 is None else {'x0': x0}
+        try:
+            res = differential_evolution(self, self._bounds, maxiter=maxiter, popsize=popsize, tol=tol, seed=seed, polish=polish, workers=workers, updating='deferred' if self._workers > 1 else 'immediate', **options)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+        return FitResult(res.x, float(res.fun), self.evaluations, bool(res.success), str(res.message))
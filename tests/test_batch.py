@@ -0,0 +1,27 @@
+import copy
+import numpy as np
+
+from mech_maker.builders import build
+from mech_maker.gcs.batch import BatchSolver
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+from mech_maker.gcs.spec import mechanism_from_spec, mechanism_to_spec
+
+def crank_rocker_specs():
+    spec = mechanism_to_spec(build('crank_rocker', ScipyLeastSquaresSolver(), 10))
+    moved = copy.deepcopy(spec)
+    moved['members'][1]['location'] = [2.2, -3.0, 0.0]
+    moved['constraints'][4]['params'][0][1] = [2.2, -3.0, 0.0]
+    return [spec, moved]
+
+def test_batch_matches_individual_solves():
+    specs = crank_rocker_specs()
+    times = [index / 10 for index in range(11)]
+    batch = BatchSolver.from_specs(specs)
+    success, states = batch.solve_times(times)
+    assert success.all()
+    for index, spec in enumerate(specs):
+        mech = mechanism_from_spec(spec, ScipyLeastSquaresSolver())
+        for step, time in enumerate(times):
+            assert mech.set_time(time)
+            expected = [float(coord) for coord in next(mech.track_points()).position()]
+            assert np.allclose(batch.track_point_locations(states[step])[index, 0], expected, atol=1e-5)
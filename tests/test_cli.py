@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('scipy', 'sklearn', 'matplotlib')
+
+def _run(code):
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+def test_import_defers_heavy_dependencies():
+    res = _run('import json, sys, time\n'
+               'start = time.perf_counter()\n'
+               'import mech_maker.cli, mech_maker.builders\n'
+               'seconds = time.perf_counter() - start\n'
+               'print(json.dumps({"seconds": seconds, "loaded": [name for name in ' + repr(HEAVY) + ' if name in sys.modules]}))')
+    assert res['loaded'] == []
+    assert res['seconds'] < 1.0
+
+def test_spec_command_stays_light():
+    res = _run('import contextlib, io, json, sys\n'
+               'from mech_maker.cli import main\n'
+               'out = io.StringIO()\n'
+               'with contextlib.redirect_stdout(out):\n'
+               '    code = main(["spec", "--mechanism", "crank_rocker"])\n'
+               'print(json.dumps({"code": code, "spec": json.loads(out.getvalue()), "loaded": [name for name in ' + repr(HEAVY) + ' if name in sys.modules]}))')
+    assert res['code'] == 0
+    assert res['loaded'] == []
+    assert len(res['spec']['members']) == 3
+
+def test_solve_command_writes_json_lines():
+    out = subprocess.run([sys.executable, '-m', 'mech_maker', 'solve', '--mechanism', 'crank_rocker', '--steps', '5'], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    records = [json.loads(line) for line in out.splitlines()]
+    assert [record['time'] for record in records] == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert all(record['success'] for record in records)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from mech_maker.curve import Curve
+
+def circle(radius, count):
+    angles = np.linspace(0.0, 2 * np.pi, count)
+    return Curve.from_arrays(np.stack([radius * np.cos(angles), radius * np.sin(angles), np.zeros(count)], axis=1), times=angles)
+
+def test_closed_circle_curvature_and_length():
+    curve = circle(2.0, 201)
+    assert curve.is_closed()
+    assert np.allclose(curve.curvature(), 0.5, rtol=1e-3)
+    assert np.isclose(curve.total_length(), 4 * np.pi, rtol=1e-3)
+
+def test_open_curve_ends_have_no_curvature():
+    curve = Curve.from_arrays(circle(2.0, 201).locations()[:100])
+    assert not curve.is_closed()
+    assert curve.curvature()[0] == 0.0 and curve.curvature()[-1] == 0.0
+
+def test_resampled_is_even_in_arc_length():
+    curve = Curve.from_arrays([[0, 0, 0], [1, 0, 0], [1, 3, 0]], times=[0.0, 1.0, 2.0])
+    resampled = curve.resampled(5)
+    assert np.allclose(np.diff(resampled.arc_lengths()), 1.0)
+    assert np.allclose(resampled.times(), [0.0, 1.0, 4 / 3, 5 / 3, 2.0])
+
+def test_transforms_keep_times_and_copy():
+    curve = circle(1.0, 9)
+    moved = curve.translated(np.array([1.0, 0.0, 0.0])).scaled(2.0)
+    assert np.allclose(moved.locations()[0], [4, 0, 0])
+    assert moved.times() is curve.times()
+    assert np.allclose(curve.locations()[0], [1, 0, 0])
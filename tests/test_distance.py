@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from mech_maker.analyzer.distance import dtw_distance, elastic_distances, frechet_distance
+
+def line(count):
+    return np.stack([np.linspace(0.0, 1.0, count), np.zeros(count)], axis=1)
+
+def ring(count, phase=0.0):
+    angles = phase + np.linspace(0.0, 2 * np.pi, count)
+    return np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+def brute_dtw(curve1, curve2):
+    costs = np.linalg.norm(curve1[:, None] - curve2[None], axis=-1)
+    acc = np.full((len(curve1) + 1, len(curve2) + 1), np.inf)
+    acc[0, 0] = 0.0
+    for i in range(len(curve1)):
+        for j in range(len(curve2)):
+            acc[i + 1, j + 1] = costs[i, j] + min(acc[i, j], acc[i, j + 1], acc[i + 1, j])
+    return acc[-1, -1]
+
+@pytest.mark.parametrize('counts', [(20, 60), (60, 20), (2, 30)])
+def test_narrow_band_stays_finite_for_unequal_lengths(counts):
+    curve1, curve2 = line(counts[0]), line(counts[1])
+    assert np.isfinite(dtw_distance(curve1, curve2, band=0.0))
+    assert frechet_distance(curve1, curve2, band=0.0) < 1.0 / min(counts)
+
+def test_unbanded_dtw_matches_brute_force():
+    rng = np.random.default_rng(0)
+    curve1, curve2 = rng.normal(size=(12, 2)), rng.normal(size=(17, 2))
+    assert np.isclose(dtw_distance(curve1, curve2, band=None), brute_dtw(curve1, curve2))
+
+def test_cyclic_distance_ignores_start_phase():
+    query = ring(33)
+    shifted = np.roll(query[:-1], 7, axis=0)
+    shifted = np.concatenate([shifted, shifted[:1]])
+    assert dtw_distance(query, shifted, cyclic=True) < 1e-9
+    assert dtw_distance(query, shifted) > 1.0
+
+def test_rejects_negative_band():
+    with pytest.raises(ValueError):
+        elastic_distances(line(5), line(5)[None], band=-0.1)
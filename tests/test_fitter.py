@@ -0,0 +1,71 @@
+import numpy as np
+
+from mech_maker.generics import Quaternion, Vec3
+from mech_maker.shape import Line
+from mech_maker.gcs.constraint import FixedAllConstraint, FixedPinConstraint, RelativePinConstraint
+from mech_maker.gcs.inputs import FixedMechanismInput, MechanismInputParams
+from mech_maker.gcs.mechanism import Mechanism2D
+from mech_maker.gcs.member import Member
+from mech_maker.gcs.outputs import TrackPoint
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+from mech_maker.synthesis.fitter import CurveFitter, resampled_distance
+
+TIMES = [index / 8 for index in range(9)]
+
+def crank_rocker(params):
+    crank_length, track_x, track_y = params
+    mech = Mechanism2D(ScipyLeastSquaresSolver(), z=0)
+    crank = Member(Vec3(-2,3,0), Quaternion.identity(), Line(crank_length))
+    mech.add_member(crank)
+    loc_params = MechanismInputParams((Vec3(0,0,0), Vec3(-3,3,0)), (Vec3(0,0,0), Vec3(-3,3,0)))
+    orient_params = MechanismInputParams((Quaternion.identity(), Quaternion.identity()), (Quaternion.identity(), Quaternion.from_axis_angle(Vec3(0,0,1), np.pi * 2.0)))
+    mech.add_input(FixedMechanismInput(FixedAllConstraint, crank, (0.0, 1.0), loc_params, orient_params))
+    rocker = Member(Vec3(2,-3,0), Quaternion.from_axis_angle(Vec3(0,0,1), np.pi / 2), Line(5.75))
+    mech.add_member(rocker)
+    mech.add_constraint(FixedPinConstraint(rocker, (Vec3(0,0,0), Vec3(2,-3,0)), (Vec3(0,0,1), Vec3(0,0,1))))
+    coupler = Member(Vec3(-3 + crank_length,3,0), Quaternion.identity(), Line(5))
+    mech.add_member(coupler)
+    mech.add_constraint(RelativePinConstraint(crank, coupler, (Vec3(crank_length,0,0), Vec3(0,0,0)), (Vec3(0,0,1), Vec3(0,0,1))))
+    mech.add_constraint(RelativePinConstraint(rocker, coupler, (Vec3(5.75,0,0), Vec3(5,0,0)), (Vec3(0,0,1), Vec3(0,0,1))))
+    mech.add_track_point(TrackPoint(coupler, Vec3(track_x, track_y, 0)))
+    return mech
+
+def _target(params):
+    mech = crank_rocker(params)
+    assert all(mech.solve_times(TIMES, None))
+    return next(mech.curves())
+
+def test_cyclic_distance_ignores_start_phase_and_direction():
+    angles = np.linspace(0, 2 * np.pi, 17)
+    ring = np.stack([np.cos(angles), np.sin(angles), 0 * angles], axis=1)
+    shifted = np.roll(ring[:-1], 5, axis=0)[::-1]
+    shifted = np.concatenate([shifted, shifted[:1]])
+    assert resampled_distance(shifted, ring, True) < 1e-20
+    assert resampled_distance(shifted, ring, False) > 0.1
+
+def test_fitter_cost_vanishes_at_the_target_parameters():
+    target = _target([1.0, 2.5, 2.5])
+    fitter = CurveFitter(crank_rocker, [(0.8, 1.2), (2.0, 3.0), (2.0, 3.0)], target, TIMES, 20)
+    assert fitter(np.array([1.0, 2.5, 2.5])) < 1e-8
+    assert fitter(np.array([1.1, 2.3, 2.7])) > 1e-3
+
+def test_fit_does_not_get_worse_than_its_start():
+    target = _target([1.0, 2.5, 2.5])
+    start = np.array([1.1, 2.4, 2.6])
+    fitter = CurveFitter(crank_rocker, [(0.8, 1.2), (2.0, 3.0), (2.0, 3.0)], target, TIMES, 20)
+    start_cost = fitter(start)
+    result = fitter.fit(maxiter=2, popsize=2, seed=0, polish=False, x0=start)
+    assert result.cost <= start_cost
+    assert result.evaluations > 1
+
+def test_fit_without_x0_works_on_scipy_before_1_7(monkeypatch):
+    import scipy.optimize
+    real = scipy.optimize.differential_evolution
+
+    def without_x0(func, bounds, maxiter, popsize, tol, seed, polish, workers, updating):
+        return real(func, bounds, maxiter=maxiter, popsize=popsize, tol=tol, seed=seed, polish=polish, workers=workers, updating=updating)
+
+    monkeypatch.setattr(scipy.optimize, 'differential_evolution', without_x0)
+    fitter = CurveFitter(crank_rocker, [(0.8, 1.2), (2.0, 3.0), (2.0, 3.0)], _target([1.0, 2.5, 2.5]), TIMES, 20)
+    result = fitter.fit(maxiter=1, popsize=2, seed=0, polish=False)
+    assert np.isfinite(result.cost)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from mech_maker.builders import build
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+
+def test_iter_solve_is_lazy():
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 10)
+    frames = mech.iter_solve([0.0, 0.1, 0.2])
+    assert len(mech.trajectory()) == 0
+    frame = next(frames)
+    assert frame.success and frame.time == 0.0
+    assert len(mech.trajectory()) == 1
+
+def test_frame_curves_are_snapshots():
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 10)
+    times = [index / 10 for index in range(10)]
+    frames = list(mech.iter_solve(times, history=True))
+    assert all(frame.success for frame in frames)
+    for index, frame in enumerate(frames):
+        curve = list(frame.curves())[0]
+        assert len(curve) == index + 1
+        assert np.allclose(curve.locations()[-1], [float(coord) for coord in frame.track_points[0]])
+
+    final = list(mech.curves())[0]
+    assert np.allclose(list(frames[-1].curves())[0].locations(), final.locations())
+
+def test_frame_shapes_match_raw_state():
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 10)
+    frames = list(mech.iter_solve([0.0, 0.5]))
+    first = [shape.vertices().copy() for shape in frames[0].shapes()]
+    mech.set_time(0.0)
+    assert all(np.allclose(a, b.vertices()) for a, b in zip(first, mech.shapes()))
+
+def test_frames_keep_no_history_by_default():
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 10)
+    frames = list(mech.iter_solve([0.0, 0.1]))
+    assert all(frame._log is None for frame in frames)
+    with pytest.raises(ValueError):
+        frames[-1].curves()
+    assert len(list(mech.curves())[0]) == 2
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from mech_maker.builders import BUILDERS, build
+from mech_maker.generics import Quaternion, Vec3
+from mech_maker.gcs.constraint import FixedAllConstraint
+from mech_maker.gcs.member import Member
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+from mech_maker.shape import Line
+
+def flat_params(constraint):
+    return [float(coord) for pair in constraint.params() for param in pair for coord in param]
+
+@pytest.mark.parametrize('name', sorted(BUILDERS))
+def test_driver_matches_fresh_constraint(name):
+    mech = build(name, ScipyLeastSquaresSolver(), 8)
+    times = [index / 8 for index in range(9)]
+    for input in mech.inputs():
+        input.compile(times[::2])
+        for time in times:
+            driver = input.driver(time)
+            fresh = input.constraint(time)
+            assert (driver is None) == (fresh is None)
+            if driver is not None:
+                assert np.allclose(flat_params(driver), flat_params(fresh))
+                assert np.allclose(driver.residuals(), fresh.residuals())
+
+def test_group_retarget_updates_sub_constraints():
+    member = Member(Vec3(1, 2, 3), Quaternion.identity(), Line(1))
+    constraint = FixedAllConstraint(member, (Vec3(0, 0, 0), Vec3(0, 0, 0)), (Quaternion.identity(), Quaternion.identity()))
+    constraint.retarget((Vec3(0, 0, 0), Vec3(1, 2, 3)), (Quaternion.identity(), Quaternion.identity()))
+    assert flat_params(constraint)[3:6] == [1, 2, 3]
+    assert np.allclose(constraint.residuals(), 0.0)
+
+def test_six_bar_solves_with_retargeted_drivers():
+    times = [index / 8 for index in range(9)]
+    compiled = build('six_bar', ScipyLeastSquaresSolver(), 8)
+    assert all(compiled.solve_times(times, None))
+    fresh = build('six_bar', ScipyLeastSquaresSolver(), 8)
+    for time in times:
+        assert fresh.set_time(time)
+        assert np.allclose(fresh.trajectory().state(time), compiled.trajectory().state(time), atol=1e-6)
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_iter_solve_compiles_and_reuses_the_driver(stream):
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 8)
+    input = next(mech.inputs())
+    times = [index / 8 for index in range(9)]
+    drivers = []
+    for frame in mech.iter_solve(iter(times) if stream else times):
+        assert frame.success
+        assert frame.time in input._schedule.times
+        driver = input.driver(frame.time)
+        assert np.allclose(flat_params(driver), flat_params(input.constraint(frame.time)))
+        drivers.append(driver)
+    assert all(driver is drivers[0] for driver in drivers)
+    if not stream:
+        assert np.array_equal(input._schedule.times, times)
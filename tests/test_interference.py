@@ -0,0 +1,34 @@
+import numpy as np
+
+from mech_maker.builders import build
+from mech_maker.gcs.interference import InterferenceChecker, segment_distances, sweep_and_prune
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+
+def sampled_distance(p1, q1, p2, q2):
+    steps = np.linspace(0.0, 1.0, 201)[:, None]
+    points1 = p1 + (q1 - p1) * steps
+    points2 = p2 + (q2 - p2) * steps
+    return np.linalg.norm(points1[:, None] - points2[None], axis=-1).min()
+
+def test_segment_distances_match_sampling():
+    rng = np.random.default_rng(0)
+    p1, q1, p2, q2 = rng.normal(size=(4, 50, 3))
+    q2[:5] = p2[:5]
+    dists = segment_distances(p1, q1, p2, q2)
+    expected = [sampled_distance(*segments) for segments in zip(p1, q1, p2, q2)]
+    assert np.allclose(dists, expected, atol=2e-2)
+    assert np.all(dists <= np.array(expected) + 1e-12)
+
+def test_sweep_and_prune_matches_brute_force():
+    rng = np.random.default_rng(1)
+    lows = rng.uniform(0.0, 10.0, size=(40, 3))
+    highs = lows + rng.uniform(0.0, 3.0, size=(40, 3))
+    expected = [(i, j) for i in range(40) for j in range(i + 1, 40) if np.all(lows[i] <= highs[j]) and np.all(lows[j] <= highs[i])]
+    assert sweep_and_prune(lows, highs) == expected
+
+def test_joints_touch_from_the_first_step():
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 16)
+    assert all(mech.solve_times([index / 16 for index in range(17)], None))
+    assert InterferenceChecker(mech).contacts() == []
+    contacts = InterferenceChecker(mech, skip_jointed=False).contacts()
+    assert [(contact.time, contact.members) for contact in contacts] == [(0.0, (0, 2)), (0.0, (1, 2))]
@@ -0,0 +1,40 @@
+import numpy as np
+
+from mech_maker.builders import build
+from mech_maker.gcs.kinematics import constraint_jacobian, member_groups, residual_vector
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver, jacobian_sparsity
+
+def test_track_point_velocities_match_finite_differences():
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 10)
+    times = np.linspace(0.0, 1.0, 81)
+    assert all(mech.solve_times(list(times), None))
+    curve = list(mech.curves())[0]
+    differences = np.gradient(curve.locations(), curve.times(), axis=0)
+    scale = np.abs(curve.velocities()).max()
+    assert np.abs(curve.velocities() - differences)[2:-2].max() < 1e-2 * scale
+
+def naive_jacobian(state, constraints, raw, step=1e-6):
+    columns = []
+    for column in range(len(raw)):
+        x = np.array(raw, dtype=float)
+        x[column] = x[column] + step
+        state.update_from_raw_values(x)
+        forward = residual_vector(constraints)
+        x[column] = x[column] - 2 * step
+        state.update_from_raw_values(x)
+        columns.append((forward - residual_vector(constraints)) / (2 * step))
+
+    state.update_from_raw_values(raw)
+    return np.array(columns).T
+
+def test_grouped_jacobian_matches_naive():
+    mech = build('six_bar', ScipyLeastSquaresSolver(), 10)
+    assert mech.set_time(0.1)
+    state = mech._state
+    constraints = mech._active_constraints() + mech._input_constraints(0.1)
+    raw = state.to_raw_values()
+    jac = constraint_jacobian(state, constraints, raw)
+    assert len(member_groups(state, constraints)) < len(list(state.members()))
+    assert np.allclose(jac, naive_jacobian(state, constraints, raw), atol=1e-6)
+    pattern = jacobian_sparsity(state, constraints).toarray()
+    assert not np.any(np.abs(jac[~pattern]) > 1e-9)
@@ -0,0 +1,45 @@
+import pickle
+import numpy as np
+
+from mech_maker.builders import build
+from mech_maker.generics import Quaternion, Vec3
+from mech_maker.shape import Line
+from mech_maker.gcs.constraint import FixedLocationConstraint, RelativePinConstraint
+from mech_maker.gcs.member import Member
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+
+TIMES = [index / 16 for index in range(17)]
+
+def test_satisfied_edit_needs_no_solves():
+    solver = ScipyLeastSquaresSolver()
+    mech = build('crank_rocker', solver, 16)
+    assert all(mech.solve_times(TIMES, None))
+    mech.add_constraint(list(mech.constraints())[-1])
+    before = solver.iterations
+    assert all(mech.solve_times_multires(TIMES))
+    assert solver.iterations == before
+    assert len(mech._stale_states) == 0
+
+def test_stale_solve_moves_only_edited_members():
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 16)
+    assert all(mech.solve_times(TIMES, None))
+    solved = {time: mech.trajectory().state(time)[:21] for time in TIMES}
+    coupler = list(mech.members())[2]
+    follower = Member(Vec3(0,0,0), Quaternion.identity(), Line(2))
+    mech.add_member(follower)
+    mech.add_constraint(RelativePinConstraint(coupler, follower, (Vec3(2.5,2.5,0), Vec3(0,0,0)), (Vec3(0,0,1), Vec3(0,0,1))))
+    assert all(mech.solve_times(TIMES, None))
+    assert len(mech._stale_states) == 0
+    for time in TIMES:
+        assert np.allclose(mech.trajectory().state(time)[:21], solved[time], atol=1e-6)
+
+def test_stale_states_survive_a_pickle_round_trip():
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 16)
+    assert all(mech.solve_times(TIMES, None))
+    coupler = list(mech.members())[2]
+    mech.add_constraint(FixedLocationConstraint(coupler, (Vec3(0,0,0), Vec3(-1,3.2,0))))
+    copy = pickle.loads(pickle.dumps(mech))
+    assert copy.solve_times(TIMES, None) == mech.solve_times(TIMES, None)
+    for time in copy.trajectory().times():
+        copy.set_time(float(time))
+        assert all(constraint.eval() < 1e-8 for constraint in copy.constraints())
@@ -0,0 +1,14 @@
+import numpy as np
+
+from mech_maker.generics import Quaternion, Vec3
+from mech_maker.gcs.member import Member
+from mech_maker.shape import Shape
+
+def test_rotation_follows_in_place_quaternion_edits():
+    member = Member(Vec3(0, 0, 0), Quaternion(1, 0, 0, 0), Shape([Vec3(1, 0, 0)]))
+    assert np.allclose(list(member.relative_location(Vec3(1, 0, 0))), [1, 0, 0])
+    half = np.sqrt(0.5)
+    member.orientation.w = half
+    member.orientation[3] = half
+    assert np.allclose(list(member.relative_location(Vec3(1, 0, 0))), [0, 1, 0])
+    assert np.allclose(member.rotation_matrix() @ [1, 0, 0], [0, 1, 0])
@@ -0,0 +1,56 @@
+import numpy as np
+
+from mech_maker.builders import build
+from mech_maker.generics import Quaternion, Vec3
+from mech_maker.shape import Line
+from mech_maker.gcs.constraint import FixedAllConstraint, RelativePinConstraint
+from mech_maker.gcs.inputs import FixedMechanismInput, MechanismInputParams
+from mech_maker.gcs.mechanism import Mechanism2D
+from mech_maker.gcs.member import Member
+from mech_maker.gcs.outputs import TrackPoint
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+
+TIMES = [index / 9 for index in range(10)]
+
+def dangling_coupler(solver):
+    mech = Mechanism2D(solver, z=0)
+    crank = Member(Vec3(0,0,0), Quaternion.identity(), Line(1))
+    mech.add_member(crank)
+    loc_params = MechanismInputParams((Vec3(0,0,0), Vec3(0,0,0)), (Vec3(0,0,0), Vec3(0,0,0)))
+    orient_params = MechanismInputParams((Quaternion.identity(), Quaternion.identity()), (Quaternion.identity(), Quaternion.from_axis_angle(Vec3(0,0,1), np.pi)))
+    mech.add_input(FixedMechanismInput(FixedAllConstraint, crank, (0.0, 1.0), loc_params, orient_params))
+    coupler = Member(Vec3(1,0,0), Quaternion.identity(), Line(2))
+    mech.add_member(coupler)
+    mech.add_constraint(RelativePinConstraint(crank, coupler, (Vec3(1,0,0), Vec3(0,0,0)), (Vec3(0,0,1), Vec3(0,0,1))))
+    mech.add_track_point(TrackPoint(coupler, Vec3(2,0,0)))
+    return mech
+
+def test_idle_freedom_does_not_fail_fast():
+    # the rocker of crank_rocker_rotated can spin about its own axis
+    mech = build('crank_rocker_rotated', ScipyLeastSquaresSolver(), 10)
+    mech.set_dof_check(True)
+    assert all(mech.solve_times(TIMES, None))
+    report = mech.analyze_dof(0.0)
+    assert report.driven_mobility == 1 and report.output_mobility == 0
+    assert report.is_determined()
+
+def test_singular_first_step_does_not_fail_fast():
+    # square_mech starts folded flat, where the parallelogram can bifurcate
+    mech = build('square_mech', ScipyLeastSquaresSolver(), 10)
+    mech.set_dof_check(True)
+    assert all(mech.solve_times(TIMES, None))
+
+def test_free_output_fails_before_solving():
+    solver = ScipyLeastSquaresSolver()
+    mech = dangling_coupler(solver)
+    mech.set_dof_check(True)
+    assert not any(mech.solve_times(TIMES, None))
+    assert solver.iterations == 0
+
+def test_drop_redundant_keeps_solutions():
+    reference = build('crank_rocker', ScipyLeastSquaresSolver(), 10)
+    assert all(reference.solve_times(TIMES, None))
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 10)
+    mech.set_dof_check(False, drop_redundant=True)
+    assert all(mech.solve_times(TIMES, None))
+    assert np.allclose(next(mech.curves()).locations(), next(reference.curves()).locations(), atol=1e-5)
@@ -0,0 +1,27 @@
+import numpy as np
+
+from mech_maker.builders import build
+from mech_maker.gcs.observer import IterationObserver
+from mech_maker.gcs.solver import ScipySLSQPSolver
+
+def test_ring_buffer_keeps_latest_throttled_iterates():
+    observer = IterationObserver(every=2, capacity=3)
+    for value in range(10):
+        observer(np.array([float(value), 0.0]))
+    assert observer.seen == 10 and observer.recorded == 5
+    assert observer.iterates()[:, 0].tolist() == [5.0, 7.0, 9.0]
+    observer.clear()
+    assert observer.iterates().shape == (0, 0)
+
+def test_solver_reports_iterates_and_callback_shapes():
+    shapes = []
+    solver = ScipySLSQPSolver(iter_callback=lambda iterate: shapes.append(list(iterate)))
+    mech = build('crank_rocker', solver, 8)
+    assert mech.set_time(0.125)
+    assert len(shapes) > 0 and len(shapes[-1]) == 3
+
+    observer = IterationObserver(capacity=4)
+    solver.set_observer(observer)
+    assert mech.set_time(0.25)
+    assert 0 < len(observer.iterates()) <= 4
+    assert [len(frame) for frame in observer.shapes(mech._state)][0] == 3
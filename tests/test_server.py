@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+
+from mech_maker.builders import build
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+from mech_maker.gcs.spec import mechanism_to_spec
+from mech_maker.server import JobServer
+
+@pytest.fixture(scope='module')
+def spec():
+    return mechanism_to_spec(build('crank_rocker', ScipyLeastSquaresSolver(), 10))
+
+async def _until(condition, timeout=30.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline
+        await asyncio.sleep(0.01)
+
+def test_identical_requests_share_a_job(spec):
+    async def run():
+        server = JobServer(workers=1)
+        try:
+            key1, job1 = server.submit(spec, [0.0, 0.5], None)
+            key2, job2 = server.submit(spec, [0.0, 0.5], None)
+            assert key1 == key2 and job1 is job2
+            result = await job1.task
+            assert all(frame['success'] for frame in result['frames'])
+            assert server.submit(spec, [0.0, 0.5], None)[1] is result
+        finally:
+            server.close()
+
+    asyncio.run(run())
+
+def test_max_queued_ignores_running_jobs(spec):
+    async def run():
+        server = JobServer(workers=1, max_concurrent=1, max_queued=1)
+        try:
+            _, running = server.submit(spec, [0.0], None)
+            await _until(lambda: running.status == 'running')
+            server.submit(spec, [0.1], None)
+            with pytest.raises(OverflowError):
+                server.submit(spec, [0.2], None)
+        finally:
+            for job in server.status():
+                server.cancel(job['job'])
+            server.close()
+
+    asyncio.run(run())
+
+def test_cancelled_job_holds_its_slot(spec):
+    async def run():
+        server = JobServer(workers=1, max_concurrent=1)
+        try:
+            key, first = server.submit(spec, [index / 20 for index in range(20)], None)
+            await _until(lambda: first.future is not None and first.future.running())
+            assert server.cancel(key)
+            _, second = server.submit(spec, [0.0], None)
+            await asyncio.sleep(0.1)
+            assert not first.future.done()
+            assert second.status == 'queued'
+            result = await second.task
+            assert first.future.done()
+            assert result['frames'][0]['success']
+        finally:
+            server.close()
+
+    asyncio.run(run())
+
+def test_half_closed_client_gets_its_result(spec):
+    async def run():
+        server = JobServer(workers=1)
+        listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        try:
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            body = json.dumps({'mechanism': spec, 'times': [0.0, 0.25, 0.5]}).encode('utf-8')
+            writer.write(b'POST /solve HTTP/1.1\r\nContent-Length: ' + str(len(body)).encode('ascii') + b'\r\n\r\n' + body)
+            writer.write_eof()
+            response = await asyncio.wait_for(reader.read(), 60)
+            writer.close()
+        finally:
+            listener.close()
+            server.close()
+
+        events = [json.loads(line) for line in response.split(b'\r\n\r\n', 1)[1].splitlines()]
+        assert [event['event'] for event in events] == ['accepted', 'frame', 'frame', 'frame', 'done']
+
+    asyncio.run(run())
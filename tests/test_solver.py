@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from mech_maker.builders import build
+from mech_maker.gcs.solver import DirectStrategy, PerturbedRestartStrategy, PortfolioSolver, ScipyLeastSquaresSolver, ScipyMinimizeSolver, Solver, SubstepStrategy
+
+def test_portfolio_rejects_duplicate_strategy_names():
+    with pytest.raises(ValueError):
+        PortfolioSolver(DirectStrategy(ScipyMinimizeSolver('BFGS')), DirectStrategy(ScipyMinimizeSolver('Powell')))
+
+def test_portfolio_stats_per_strategy():
+    solver = PortfolioSolver(DirectStrategy(ScipyLeastSquaresSolver(), name='lsq'),
+                             DirectStrategy(ScipyMinimizeSolver('BFGS'), name='bfgs'))
+    mech = build('crank_rocker', solver, 5)
+    assert all(mech.solve_times([0.0, 0.1, 0.2], None))
+    stats = solver.stats()
+    assert stats['lsq'].attempts == 3 and stats['lsq'].successes == 3
+    assert stats['bfgs'].attempts == 0
+
+@pytest.mark.parametrize('stride', [8, 3, 6])
+def test_multires_matches_dense_solve(stride):
+    times = [index / 24 for index in range(25)]
+    dense = build('crank_rocker', ScipyLeastSquaresSolver(), 24)
+    assert all(dense.solve_times(times, None))
+    multires = build('crank_rocker', ScipyLeastSquaresSolver(), 24)
+    assert all(multires.solve_times_multires(times, coarse_stride=stride))
+    for time in times:
+        assert np.allclose(dense.trajectory().state(time), multires.trajectory().state(time), atol=1e-6)
+
+class FailingSolver(Solver):
+    """Scrambles the state and gives up, recording the state it started from"""
+    def __init__(self) -> None:
+        self.starts = []
+
+    def solve(self, state, constraints):
+        raw = state.to_raw_values()
+        self.starts.append(list(raw))
+        state.update_from_raw_values([val + 1.0 for val in raw])
+        return False
+
+class FirstCallFails(Solver):
+    """Fails once, then hands over to a least squares solver"""
+    def __init__(self) -> None:
+        self.starts = []
+        self._inner = ScipyLeastSquaresSolver()
+
+    def solve(self, state, constraints):
+        self.starts.append(list(state.to_raw_values()))
+        return len(self.starts) > 1 and self._inner.solve(state, constraints)
+
+def solved_crank_rocker():
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 4)
+    assert mech.set_time(0.0)
+    return mech
+
+def test_fallback_starts_from_the_restored_state():
+    mech = solved_crank_rocker()
+    failing, recording = FailingSolver(), FailingSolver()
+    mech.set_solver(PortfolioSolver(DirectStrategy(failing, name='scramble'), DirectStrategy(recording, name='record')))
+    raw = mech._state.to_raw_values()
+    assert not mech.set_time(0.25)
+    assert np.allclose(recording.starts[0], failing.starts[0])
+    assert np.allclose(mech._state.to_raw_values(), raw)
+
+def test_fallback_recovers_a_failed_primary_and_budget_is_a_lifetime_cap():
+    mech = solved_crank_rocker()
+    solver = PortfolioSolver(DirectStrategy(ScipyLeastSquaresSolver(options={'max_nfev': 1}), name='capped', budget=2),
+                             DirectStrategy(ScipyLeastSquaresSolver(), name='full'))
+    mech.set_solver(solver)
+    assert all(mech.solve_times([0.25, 0.5, 0.75], None))
+    stats = solver.stats()
+    assert stats['capped'].attempts == 2 and stats['capped'].successes == 0
+    assert stats['full'].attempts == 3 and stats['full'].successes == 3
+
+def test_substeps_recover_a_step_too_large_for_the_direct_solve():
+    mech = solved_crank_rocker()
+    limited = ScipyLeastSquaresSolver(options={'max_nfev': 6})
+    solver = PortfolioSolver(DirectStrategy(limited), SubstepStrategy(limited, divisions=4))
+    mech.set_solver(solver)
+    assert mech.set_time(0.25)
+    stats = solver.stats()
+    assert stats['ScipyLeastSquaresSolver'].successes == 0
+    assert stats['substep'].successes == 1
+
+def test_perturbed_restart_recovers_from_a_stuck_start():
+    mech = solved_crank_rocker()
+    picky = FirstCallFails()
+    solver = PortfolioSolver(PerturbedRestartStrategy(picky, scale=1e-3, seed=0))
+    mech.set_solver(solver)
+    assert mech.set_time(0.25)
+    assert len(picky.starts) == 2
+    assert not np.allclose(picky.starts[0], picky.starts[1])
+    assert solver.stats()['perturbed_restart'].successes == 1
@@ -0,0 +1,38 @@
+import pickle
+
+import pytest
+
+from mech_maker.builders import BUILDERS, build
+from mech_maker.generics import Quaternion, Vec3
+from mech_maker.shape import Line
+from mech_maker.gcs.member import Member
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+from mech_maker.gcs.spec import dumps, loads, mechanism_to_spec, spec_digest
+from mech_maker.gcs.state import MechanismState
+
+@pytest.mark.parametrize('name', sorted(BUILDERS))
+def test_spec_round_trip(name):
+    mech = build(name, ScipyLeastSquaresSolver(), 10)
+    text = dumps(mech)
+    loaded = loads(text, ScipyLeastSquaresSolver())
+    assert dumps(loaded) == text
+    assert spec_digest(mechanism_to_spec(loaded)) == spec_digest(mechanism_to_spec(mech))
+
+def test_mechanism_pickles():
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 10)
+    assert dumps(pickle.loads(pickle.dumps(mech))) == dumps(mech)
+
+def test_state_update_after_add_member():
+    state = MechanismState()
+    state.add_member(Member(Vec3(0,0,0), Quaternion.identity(), Line(1)))
+    raw = state.to_raw_values()
+    member = Member(Vec3(0,0,0), Quaternion.identity(), Line(1))
+    state.add_member(member)
+    state.update_from_raw_values(raw + [1.0, 2.0, 3.0, 1.0, 0.0, 0.0, 0.0])
+    assert list(member.location) == [1.0, 2.0, 3.0]
+
+def test_state_rejects_wrong_length():
+    state = MechanismState()
+    state.add_member(Member(Vec3(0,0,0), Quaternion.identity(), Line(1)))
+    with pytest.raises(ValueError):
+        state.update_from_raw_values([0.0] * 3)
@@ -0,0 +1,32 @@
+import numpy as np
+
+import mech_maker
+from mech_maker.generics import Quaternion, Vec3
+from mech_maker.shape import Line, Shape
+from mech_maker.gcs.member import Member
+from mech_maker.gcs.state import MechanismState
+
+def test_vertex_buffer_follows_shape_edits():
+    state = MechanismState()
+    shape = Shape([Vec3(0, 0, 0), Vec3(1, 0, 0)])
+    state.add_member(Member(Vec3(1, 0, 0), Quaternion.identity(), shape))
+    state.add_member(Member(Vec3(0, 2, 0), Quaternion.identity(), Line(1)))
+    assert state.vertex_offsets() == [0, 2, 4]
+    shape.add_point(Vec3(1, 1, 0))
+    assert state.vertex_offsets() == [0, 3, 5]
+    assert np.allclose(state.world_vertices(), [[1, 0, 0], [2, 0, 0], [2, 1, 0], [0, 2, 0], [1, 2, 0]])
+    assert [len(shape) for shape in state.shapes()] == [3, 2]
+
+def test_union_annotations_are_postponed():
+    # the pinned numpy and scipy stop at Python 3.9, which cannot evaluate X | Y
+    import ast
+    import pathlib
+
+    for path in pathlib.Path(mech_maker.__file__).parent.rglob('*.py'):
+        tree = ast.parse(path.read_text())
+        postponed = any(isinstance(node, ast.ImportFrom) and node.module == '__future__' for node in tree.body)
+        signatures = [node for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        annotations = [arg.annotation for node in signatures for arg in node.args.args + node.args.kwonlyargs if arg.annotation is not None]
+        annotations += [node.returns for node in signatures if node.returns is not None]
+        unions = [node for annotation in annotations for node in ast.walk(annotation) if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr)]
+        assert postponed or not unions, str(path)
@@ -0,0 +1,57 @@
+import pickle
+import numpy as np
+
+from mech_maker.builders import build
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+from mech_maker.gcs.trajectory import Trajectory
+
+def identity_state(x):
+    return [x, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0]
+
+def test_insert_keeps_times_sorted():
+    trajectory = Trajectory([[0, 3, 7]])
+    for time in [0.5, 0.0, 1.0, 0.25]:
+        trajectory.insert(time, identity_state(time), [0.0] * 7)
+    trajectory.insert(0.5 + 1e-14, identity_state(2.0), [0.0] * 7)
+    assert np.allclose(trajectory.times(), [0.0, 0.25, 0.5, 1.0])
+    assert trajectory.state(0.5)[0] == 2.0
+    assert 0.75 not in trajectory
+    assert np.isclose(trajectory.interpolate(0.75)[0], 1.5)
+
+def test_memmap_is_the_storage(tmp_path):
+    path = str(tmp_path / 'states.npy')
+    trajectory = Trajectory([[0, 3, 7]], path=path)
+    for time in [0.5, 0.0, 1.0]:
+        trajectory.insert(time, identity_state(time), [0.0] * 7)
+    view = trajectory.memmap()
+    assert np.shares_memory(view, trajectory.states())
+    assert np.array_equal(view[:, 0], [0.0, 0.5, 1.0])
+    trajectory.insert(0.5, identity_state(3.0), [0.0] * 7)
+    assert view[1, 1] == 3.0
+    loaded = np.load(path)
+    assert np.array_equal(loaded[:3, 1:], trajectory.states())
+    assert np.isnan(loaded[3:]).all()
+    for time in range(2, 12):
+        trajectory.insert(float(time), identity_state(time), [0.0] * 7)
+    assert view[1, 1] == 3.0
+    assert np.array_equal(np.load(path)[:len(trajectory), 0], trajectory.times())
+
+def test_mechanism_solves_into_a_backing_file(tmp_path):
+    path = str(tmp_path / 'crank_rocker.npy')
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 8)
+    assert mech.set_time(0.0)
+    mech.set_trajectory_path(path)
+    times = [index / 8 for index in range(9)]
+    assert all(mech.solve_times(times, None))
+    assert np.allclose(mech.trajectory().memmap()[:, 0], times)
+    copy = pickle.loads(pickle.dumps(mech))
+    assert copy.trajectory().path is None
+    assert np.array_equal(copy.trajectory().states(), mech.trajectory().states())
+
+def test_npz_round_trip(tmp_path):
+    trajectory = Trajectory([[0, 3, 7]])
+    trajectory.insert(0.0, identity_state(1.0), [1.0] * 7)
+    trajectory.save_npz(str(tmp_path / 'trajectory.npz'))
+    loaded = Trajectory.load_npz(str(tmp_path / 'trajectory.npz'))
+    assert np.array_equal(loaded.states(), trajectory.states())
+    assert np.array_equal(loaded.rates(), trajectory.rates())
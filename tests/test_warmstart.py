@@ -0,0 +1,31 @@
+import pytest
+
+from mech_maker.builders import build
+from mech_maker.generics import Vec3
+from mech_maker.gcs.constraint import OnPlaneConstraint
+from mech_maker.gcs.solver import ScipyLeastSquaresSolver
+from mech_maker.gcs.warmstart import KNNWarmStart
+
+TIMES = [index / 8 for index in range(9)]
+
+def test_predictions_from_a_solved_twin():
+    provider = KNNWarmStart(k=1)
+    solved = build('crank_rocker', ScipyLeastSquaresSolver(), 8)
+    assert all(solved.solve_times(TIMES, None))
+    provider.add_mechanism(solved)
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 8)
+    mech.set_warm_start(provider)
+    assert all(mech.solve_times(TIMES, None))
+    assert provider.stats().predictions > 0
+
+def test_unserializable_mechanism_falls_back():
+    provider = KNNWarmStart()
+    mech = build('crank_rocker', ScipyLeastSquaresSolver(), 8)
+    coupler = list(mech.members())[2]
+    mech.add_constraint(OnPlaneConstraint(coupler, Vec3(0,0,0), lambda location: location.z))
+    mech.set_warm_start(provider)
+    assert mech.parameters() is None
+    assert all(mech.solve_times(TIMES, None))
+    assert provider.stats().predictions == 0 and provider.stats().fallbacks == len(TIMES)
+    with pytest.raises(TypeError):
+        provider.add_mechanism(mech)